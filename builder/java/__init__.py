@@ -1,4 +1,4 @@
-from builder.schema import BooleanSchema, ObjectSchema, StringSchema, ArraySchema
+from builder.schema import BooleanSchema, ObjectSchema, StringSchema, ArraySchema, IntegerSchema
 from builder.schema_validator import SchemaValidator
 from .sync_ij import sync_dependencies_to_ij
 from ..models import Task, Language
@@ -61,7 +61,8 @@ _package_configuration_schema = ObjectSchema()\
                 'merge', 'first', 'last', 'newest', 'oldest', 'largest', 'smallest'
             )),
         sources=BooleanSchema(),
-        doc=BooleanSchema()
+        doc=BooleanSchema(),
+        compression_level=IntegerSchema(minimum=0, maximum=9)
     )\
     .additional_properties(False)
 
@@ -70,6 +71,9 @@ configuration_schema = SchemaValidator(schema=_configuration_schema)
 
 
 def define_language(language: Language):
+    if java_version() is None:
+        end('The Java Development Kit (JDK) is not available on the path.')
+
     language.configuration_class = configuration_class
     language.configuration_schema = configuration_schema
     language.tasks = [
@@ -93,6 +97,3 @@ def define_language(language: Language):
     language.resolver = resolve
     language.project_as_dist_path = project_to_dist_dir
 
-
-if java_version is None:
-    end('The Java Development Kit (JDK) is not available on the path.')
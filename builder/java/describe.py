@@ -1,159 +1,118 @@
 """
-This file provides all the support we need around the `javap` tool for describing
-compiled Java classes.
+This file provides all the support we need for describing compiled Java classes.
+Class files are read directly, which is far cheaper than starting a JVM to run a
+tool like ``javap`` over them.
 """
-import re
+import struct
 from pathlib import Path
-from typing import Sequence, List
+from typing import Dict, Optional
 
-from builder.java.java import _add_verbose_options
-from builder.utils import checked_run, get_matching_files
+_class_file_magic = 0xCAFEBABE
+_acc_public = 0x0001
+_acc_static = 0x0008
+_acc_interface = 0x0200
+_entry_point_name = b'main'
+_entry_point_descriptor = b'([Ljava/lang/String;)V'
 
-_name_pattern = re.compile(r'^(?:public |protected |private |abstract )?(?:final )?(class|interface) ([.$\w]+) ')
-_entry_point_signature = 'public static void main(java.lang.String[]);'
+# The sizes of the constant pool entries we skip over, keyed by tag.
+_constant_sizes = {
+    3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4, 12: 4, 15: 3, 16: 2, 17: 4, 18: 4, 19: 2, 20: 2
+}
 
 
-class JavaClass(object):
+def _skip_members(data: bytes, offset: int) -> int:
     """
-    This class provides a representation of the information we gather about a class
-    by running the ``javap`` CLI tool.
-    """
-    def __init__(self, lines: Sequence[str]):
-        match = _name_pattern.match(lines[0])
-        self._type = match.group(1)
-        self._name = match.group(2)
-        self._lines = [line.strip() for line in lines[1:-1]]
-
-    def type(self):
-        """
-        The type of the class, either `class` or `interface`.
-
-        :return: the type of compiled thing we found.
-        """
-        return self._type
-
-    def name(self):
-        """
-        The name of the class.
+    A helper function that skips over a list of fields or methods in a class file.
 
-        :return: the name of the class or interface.
-        """
-        return self._name
+    :param data: the content of the class file.
+    :param offset: the offset of the count of members in the list.
+    :return: the offset just past the list.
+    """
+    count, = struct.unpack_from('>H', data, offset)
+    offset = offset + 2
 
-    def is_entry_point(self) -> bool:
-        """
-        Tells whether the class we represent is an application entry point.
-        The type must be ``class`` and the content must include a static ``main``
-        method for this to return ``True``.
+    for _ in range(count):
+        offset = _skip_attributes(data, offset + 6)
 
-        :return: whether what we represent is a Java application entry point or
-        not.
-        """
-        return 'class' == self._type and _entry_point_signature in self._lines
+    return offset
 
 
-def _group_class_file_names(paths: Sequence[Path], max_length: int = 3900) -> Sequence[Sequence[Path]]:
-    """
-    Take the given sequence of paths and split them into sequences such that
-    their cumulative length is no more than requested.  This is used to build
-    command lines for the ``javap`` tool that are not overly long, regardless of
-    the lengths of individual class file names while still minimizing the number
-    of times the ``javap`` tool must be invoked.
-
-    :param paths: the list of paths to group.
-    :param max_length: the maximum cumulative length to allow.  The default is
-    3900.
-    :return: a sequence of sequences.  Each sub-sequence contains an appropriate
-    number of paths.
+def _skip_attributes(data: bytes, offset: int) -> int:
     """
-    sets = []
-    start = 0
-    length = 0
+    A helper function that skips over a list of attributes in a class file.
 
-    for index, path in enumerate(paths):
-        path_length = len(str(path)) + 1
-        if length + path_length > max_length:
-            sets.append(paths[start:index])
-            start = index
-            length = 0
-        else:
-            length = length + path_length
+    :param data: the content of the class file.
+    :param offset: the offset of the count of attributes in the list.
+    :return: the offset just past the list.
+    """
+    count, = struct.unpack_from('>H', data, offset)
+    offset = offset + 2
 
-    sets.append(paths[start:])
+    for _ in range(count):
+        length, = struct.unpack_from('>I', data, offset + 2)
+        offset = offset + 6 + length
 
-    return sets
+    return offset
 
 
-def _parse_class_info_output(lines: Sequence[str], classes: List[JavaClass]):
+def read_entry_point(path: Path) -> Optional[str]:
     """
-    A function that parses the lines printed by the ``javap`` tool into a list
-    of representative ``JavaClass`` objects.
-
-    :param lines: the output lines from the ``javap`` tool to parse.
-    :return: the resulting list of Java object representations.
+    This function reads a compiled class file to see whether it is an entry point.  A
+    class (not an interface) is an entry point if it has a ``public static void
+    main(String[])`` method.  The class itself need not be public; the Java launcher
+    runs package-private classes too.  Reading the class file directly avoids the cost
+    of starting a JVM to describe it.
+
+    :param path: the path to the class file to read.
+    :return: the name of the class, if it is an entry point, or ``None``.
     """
-    start = 1
-
-    for index, line in enumerate(lines):
-        if line.startswith('Compiled from '):
-            if start < index:
-                classes.append(JavaClass(lines[start:index]))
-            start = index + 1
+    data = path.read_bytes()
 
-    classes.append(JavaClass(lines[start:]))
+    try:
+        magic, pool_count = struct.unpack_from('>I4xH', data)
 
+        if magic != _class_file_magic:
+            raise ValueError(f'{path} is not a compiled Java class file.')
 
-def _run_describer(classes_dir: Path, paths: Sequence[Path], public_only: bool) -> Sequence[str]:
-    """
-    A function that wraps the execution of the ``javap`` tool.
-
-    :param classes_dir: the root directory for all the classes we are passing to the
-    ``javap`` tool.
-    :param paths: the sequence of class files to pass to the ``javap`` tool.  Each must
-    be relative to ``classes_dir``.
-    :param public_only: controls whether the ``-public`` switch is given to ``javap``.
-    :return: the output of the ``javap`` tool, as a sequence of lines.
-    """
-    # noinspection SpellCheckingInspection
-    options = []
+        strings: Dict[int, bytes] = {}
+        classes: Dict[int, int] = {}
+        offset = 10
+        index = 1
 
-    if public_only:
-        options.append('-public')
+        while index < pool_count:
+            tag = data[offset]
 
-    _add_verbose_options(options)
+            if tag == 1:
+                length, = struct.unpack_from('>H', data, offset + 1)
+                strings[index] = data[offset + 3:offset + 3 + length]
+                offset = offset + 3 + length
+            else:
+                if tag == 7:
+                    classes[index], = struct.unpack_from('>H', data, offset + 1)
 
-    for path in paths:
-        options.append(str(path))
+                offset = offset + 1 + _constant_sizes[tag]
 
-    # Needs to happen last because of how verbose works.
-    options.insert(0, 'javap')
+            # Long and double constants take up two slots in the pool.
+            index = index + (2 if tag == 5 or tag == 6 else 1)
 
-    process = checked_run(options, 'Class description', capture=True, cwd=classes_dir)
-    lines = process.stdout.decode().split('\n')
+        access_flags, this_class, _, interface_count = struct.unpack_from('>HHHH', data, offset)
 
-    return lines
+        if access_flags & _acc_interface:
+            return None
 
+        offset = _skip_members(data, offset + 8 + 2 * interface_count)
+        method_count, = struct.unpack_from('>H', data, offset)
+        offset = offset + 2
 
-def describe_classes(classes_dir: Path, public_only: bool = True) -> Sequence[JavaClass]:
-    """
-    This function locates all the class files in the directory sub-tree rooted
-    at the specified classes directory and generates a ``JavaClass`` instance for
-    each one found by using the ``javap`` CLI tool to describe it.
-
-    :param classes_dir: the directory to scan for class files.
-    :param public_only: a flag that controls whether we ask for public information
-    only about each class.  The default is ``True``.
-    :return: a sequence of ``JavaClass`` objects that describe each of the class files
-    we found under the requested directory..
-    """
-    class_files = get_matching_files(classes_dir, '**/*.class')
-    classes = []
+        for _ in range(method_count):
+            method_flags, name_index, descriptor_index = struct.unpack_from('>HHH', data, offset)
 
-    if len(class_files) > 0:
-        class_file_sets = _group_class_file_names(class_files)
+            if method_flags & (_acc_public | _acc_static) == _acc_public | _acc_static and \
+                    strings[name_index] == _entry_point_name and strings[descriptor_index] == _entry_point_descriptor:
+                return strings[classes[this_class]].decode('utf-8').replace('/', '.')
 
-        for class_file_set in class_file_sets:
-            output = _run_describer(classes_dir, class_file_set, public_only)
-            _parse_class_info_output(output, classes)
+            offset = _skip_attributes(data, offset + 6)
+    except (struct.error, IndexError, KeyError, UnicodeDecodeError):
+        raise ValueError(f'{path} is not a valid compiled Java class file.')
 
-    return classes
+    return None
@@ -74,7 +74,7 @@ def _create_directory_tree(language_config: JavaConfiguration):
 
 def _create_misc_xml(ij_project: IJProject):
     _ = ij_project.misc_file(
-        java_version_number=java_version_number
+        java_version_number=java_version_number()
     )
 
 
@@ -2,17 +2,56 @@
 This library contains all the build tasks and support code for Java.
 """
 import fnmatch
+import functools
+import itertools
 import os
 import re
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Tuple, Union, Dict
+from typing import Optional, List, Tuple, Union, Dict, FrozenSet
 from zipfile import ZipInfo
 
 from builder.models import DependencyPathSet, Dependency, RemoteResolver
 from builder.utils import checked_run, global_options, remove_directory
 
+# Marks a path whose disposition has not been cached yet; ``None`` is a valid disposition.
+_MISS = object()
+_glob_characters = re.compile(r'[*?\[]')
+_maven_repository_url = 'https://repo1.maven.org/maven2'
+_javac_version_pattern = re.compile(rb'\S+[ \t]+((\d+)\S*)')
+
+# These are the fixed rules for jar entries that every package configuration shares.
+_manifest_pattern = re.compile(r'meta-inf/manifest\.mf\Z', re.IGNORECASE)
+_merged_file_pattern = re.compile(r'meta-inf/(?:license\.txt|license|notice)\Z', re.IGNORECASE)
+_service_file_pattern = re.compile(
+    r'meta-inf(?-i:/services/[a-zA-Z_$][a-zA-Z\d_$]*(?:\.[a-zA-Z_$][a-zA-Z\d_$]*)*)\Z', re.IGNORECASE
+)
+
 
 class JavaConfiguration(object):
+    __slots__ = (
+        'type', 'source', 'build', 'code_source', 'code_resources', 'code_target', 'code_doc', 'tests_source',
+        'test_resources', 'tests_target', 'dist', 'app_target', 'lib_target', '_project', '_directories'
+    )
+
+    # This maps each of our directories to the names of the attributes that hold the parts
+    # of its path, relative to the project.
+    _directory_parts = {
+        'code': ('source', 'code_source'),
+        'resources': ('source', 'code_resources'),
+        'tests': ('source', 'tests_source'),
+        'test_resources': ('source', 'test_resources'),
+        'build': ('build',),
+        'classes': ('build', 'code_target'),
+        'tests_classes': ('build', 'tests_target'),
+        'doc': ('build', 'code_doc'),
+        'dist': ('dist',),
+        'library_dist': ('dist', 'lib_target'),
+        'application_dist': ('dist', 'app_target')
+    }
+
     def __init__(self):
         self.type = 'library'
         self.source = 'src'
@@ -29,17 +68,7 @@ class JavaConfiguration(object):
         self.lib_target = 'lib'
 
         self._project = global_options.project()
-        self._code_dir = None
-        self._resources_dir = None
-        self._tests_dir = None
-        self._test_resources_dir = None
-        self._build_dir = None
-        self._classes_dir = None
-        self._test_target_dir = None
-        self._doc_dir = None
-        self._dist_dir = None
-        self._lib_dir = None
-        self._app_dir = None
+        self._directories: Dict[str, Tuple[Path, bool, bool]] = {}
 
     @property
     def project(self):
@@ -50,6 +79,46 @@ class JavaConfiguration(object):
         """
         return self._project
 
+    def _get_directory(self, name: str, required: bool, ensure: bool) -> Path:
+        """
+        A helper function that resolves a directory under our project from the given
+        path parts.  The resolved directory is remembered under the given name, along
+        with whether it has been verified to exist and whether it has been ensured, so
+        the project only has to be asked again when a caller needs a stronger guarantee
+        than any previous caller did.
+
+        :param name: the name of the directory in our table of directory parts.
+        :param required: a flag indicating whether we should fail if the directory
+        does not exist.
+        :param ensure: a flag indicating whether the directory should be created if
+        it doesn't exist.
+        :return: the absolute path to the requested directory.
+        """
+        entry = self._directories.get(name)
+
+        if entry is not None:
+            directory, was_required, was_ensured = entry
+
+            if required <= was_required and ensure <= was_ensured:
+                return directory
+
+            required = required or was_required
+            ensure = ensure or was_ensured
+
+        parts = [getattr(self, attr) for attr in self._directory_parts[name]]
+        directory = self._project.project_dir(Path(*parts), required, ensure)
+        # A directory we have ensured is known to exist, which is all required asks for.
+        self._directories[name] = directory, required or ensure, ensure
+
+        return directory
+
+    def clear_directory_cache(self):
+        """
+        A function that forgets all the directories we have resolved, so they are
+        resolved (and checked or created) again the next time they are asked for.
+        """
+        self._directories.clear()
+
     def code_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
         A function that returns the path to where Java source files should be found.
@@ -61,11 +130,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to the Java source files of the project.
         """
-        if not self._code_dir:
-            self._code_dir = self._project.project_dir(
-                Path(self.source) / Path(self.code_source), required, ensure
-            )
-        return self._code_dir
+        return self._get_directory('code', required, ensure)
 
     def resources_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -79,11 +144,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to the code resource files of the project.
         """
-        if not self._resources_dir:
-            self._resources_dir = self._project.project_dir(
-                Path(self.source) / Path(self.code_resources), required, ensure
-            )
-        return self._resources_dir
+        return self._get_directory('resources', required, ensure)
 
     def tests_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -96,11 +157,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to the test source files of the project.
         """
-        if not self._tests_dir:
-            self._tests_dir = self._project.project_dir(
-                Path(self.source) / Path(self.tests_source), required, ensure
-            )
-        return self._tests_dir
+        return self._get_directory('tests', required, ensure)
 
     def test_resources_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -114,11 +171,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to the test resource files of the project.
         """
-        if not self._test_resources_dir:
-            self._test_resources_dir = self._project.project_dir(
-                Path(self.source) / Path(self.test_resources), required, ensure
-            )
-        return self._test_resources_dir
+        return self._get_directory('test_resources', required, ensure)
 
     def build_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -132,9 +185,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to where build artifacts will be written.
         """
-        if not self._build_dir:
-            self._build_dir = self._project.project_dir(Path(self.build), required, ensure)
-        return self._build_dir
+        return self._get_directory('build', required, ensure)
 
     def classes_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -148,11 +199,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to where compiled code files will be written.
         """
-        if not self._classes_dir:
-            self._classes_dir = self._project.project_dir(
-                Path(self.build) / Path(self.code_target), required, ensure
-            )
-        return self._classes_dir
+        return self._get_directory('classes', required, ensure)
 
     def tests_classes_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -166,11 +213,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to where compiled tests will be written.
         """
-        if not self._test_target_dir:
-            self._test_target_dir = self._project.project_dir(
-                Path(self.build) / Path(self.tests_target), required, ensure
-            )
-        return self._test_target_dir
+        return self._get_directory('tests_classes', required, ensure)
 
     def doc_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -184,11 +227,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to where JavaDoc files will be written.
         """
-        if not self._doc_dir:
-            self._doc_dir = self._project.project_dir(
-                Path(self.build) / Path(self.code_doc), required, ensure
-            )
-        return self._doc_dir
+        return self._get_directory('doc', required, ensure)
 
     def dist_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -202,9 +241,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to where distribution artifacts will be written.
         """
-        if not self._dist_dir:
-            self._dist_dir = self._project.project_dir(Path(self.dist), required, ensure)
-        return self._dist_dir
+        return self._get_directory('dist', required, ensure)
 
     def library_dist_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -218,11 +255,7 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to where library artifacts will be written.
         """
-        if not self._lib_dir:
-            self._lib_dir = self._project.project_dir(
-                Path(self.dist) / Path(self.lib_target), required, ensure
-            )
-        return self._lib_dir
+        return self._get_directory('library_dist', required, ensure)
 
     def application_dist_dir(self, required: bool = False, ensure: bool = False) -> Path:
         """
@@ -236,14 +269,15 @@ class JavaConfiguration(object):
         it doesn't exist.
         :return: the path to where application artifacts will be written.
         """
-        if not self._app_dir:
-            self._app_dir = self._project.project_dir(
-                Path(self.dist) / Path(self.app_target), required, ensure
-            )
-        return self._app_dir
+        return self._get_directory('application_dist', required, ensure)
 
 
 class TestingConfiguration(object):
+    __slots__ = (
+        'test_executor', 'coverage_agent', 'coverage_reporter', 'test_reports', 'coverage_reports', 'no_tests',
+        '_test_reports_dir', '_coverage_reports_dir'
+    )
+
     def __init__(self):
         self.test_executor = 'junit5'
         self.coverage_agent = 'jacoco'
@@ -270,7 +304,7 @@ class TestingConfiguration(object):
         """
         if not self._test_reports_dir and self.test_reports:
             self._test_reports_dir = config.project.project_dir(
-                Path(config.build) / Path(self.test_reports), required, ensure
+                Path(config.build, self.test_reports), required, ensure
             )
         return self._test_reports_dir
 
@@ -289,12 +323,19 @@ class TestingConfiguration(object):
         """
         if not self._coverage_reports_dir and self.coverage_reports:
             self._coverage_reports_dir = config.project.project_dir(
-                Path(config.build) / Path(self.coverage_reports), required, ensure
+                Path(config.build, self.coverage_reports), required, ensure
             )
         return self._coverage_reports_dir
 
 
 class PackageConfiguration(object):
+    __slots__ = (
+        'entry_point', 'fat_jar', 'include', 'exclude', 'duplicates', 'sources', 'doc', 'compression_level',
+        '_extra_content',
+        '_dispositions_built', '_literal_excludes', '_exclude_pattern', '_exclude_regexes', '_duplicate_rules',
+        '_disposition_cache'
+    )
+
     def __init__(self):
         self.entry_point = None
         self.fat_jar = None
@@ -303,9 +344,22 @@ class PackageConfiguration(object):
         self.duplicates: Dict[str, str] = {}
         self.sources = None
         self.doc = None
+        self.compression_level: Optional[int] = None
+
+        self._extra_content: Optional[List[Tuple[Path, Optional[Path]]]] = None
+        self._dispositions_built = False
+        self._literal_excludes: FrozenSet[str] = frozenset()
+        self._exclude_pattern: Optional[re.Pattern] = None
+        self._exclude_regexes: Tuple[re.Pattern, ...] = ()
+        self._duplicate_rules: Tuple[Tuple[re.Pattern, Union[str, Dict[str, str]]], ...] = ()
+        self._disposition_cache: Dict[str, Optional[str]] = {}
 
-        self._extra_content: List[Tuple[Path, Optional[Path]]] = []
-        self._path_dispositions: List[Tuple[re.Pattern, str]] = []
+    def __setattr__(self, name: str, value):
+        # Compiled dispositions must not outlive the settings they were built from.
+        if name in ('exclude', 'duplicates'):
+            object.__setattr__(self, '_dispositions_built', False)
+
+        object.__setattr__(self, name, value)
 
     def get_entry_point(self) -> Optional[str]:
         """
@@ -344,8 +398,10 @@ class PackageConfiguration(object):
         :param config: the language level configuration.
         :return: a list of tuples representing extra content to include.
         """
-        if len(self._extra_content) == 0:
+        if self._extra_content is None:
             # If this is our first time, then create all our extra content path tuples.
+            self._extra_content = []
+
             for include in self.include:
                 source = config.project.project_dir(include['source'])
                 under = None
@@ -360,37 +416,42 @@ class PackageConfiguration(object):
     def _build_path_dispositions(self):
         """
         A helper function for converting our raw file disposition related configuration
-        information into the patterns and actions we will act upon.
+        information into the patterns and actions we will act upon.  The compiled forms
+        are shared by every package configuration with the same rules.
         """
-        manifest_files = '|'.join(['license.txt', 'license', 'notice'])
+        self._literal_excludes, self._exclude_pattern, self._exclude_regexes = _compile_excludes(tuple(self.exclude))
+        self._duplicate_rules = _compile_duplicates(tuple(self.duplicates.items()))
+        self._disposition_cache.clear()
+        self._dispositions_built = True
 
-        self._add_path_dispositions(r'~(?i:meta-inf/manifest.mf)\Z', 'exclude')
+    def _find_path_disposition(self, text: str) -> Optional[str]:
+        """
+        A helper method that works out the disposition for a relative path.  The
+        rules are checked in order: the jar manifest and configured excludes, then
+        the ``META-INF`` files we always merge and, finally, configured duplicate
+        handling rules.  The first rule that matches decides the disposition.
 
-        for text in self.exclude:
-            self._add_path_dispositions(text, 'exclude')
+        :param text: the relative path, as a string.
+        :return: the disposition for the path or ``None``.
+        """
+        # Most entries are not under META-INF so don't bother with its rules for them.
+        in_meta_inf = text[:9].lower() == 'meta-inf/'
 
-        self._add_path_dispositions(r'~(?i:meta-inf/(?:' + manifest_files + r'))\Z', 'merge')
-        self._add_path_dispositions(
-            r'~(?i:meta-inf)/services/[a-zA-Z_$][a-zA-Z\d_$]*(?:\.[a-zA-Z_$][a-zA-Z\d_$]*)*\Z', 'merge'
-        )
+        if text in self._literal_excludes or (in_meta_inf and _manifest_pattern.match(text)) or \
+                (self._exclude_pattern and self._exclude_pattern.match(text)) or \
+                any(pattern.match(text) for pattern in self._exclude_regexes):
+            return 'exclude'
 
-        for text, action in self.duplicates.items():
-            self._add_path_dispositions(text, action)
+        if in_meta_inf and (_merged_file_pattern.match(text) or _service_file_pattern.match(text)):
+            return 'merge'
 
-    def _add_path_dispositions(self, text: str, action: str):
-        """
-        A helper method for converting and storing a file pattern along with the
-        action to take when a path matches it.
+        for pattern, actions in self._duplicate_rules:
+            match = pattern.match(text)
 
-        :param text: the string pattern to convert.
-        :param action: the action to take on matching paths.
-        """
-        if text[0] == '~':
-            pattern = re.compile(text[1:])
-        else:
-            pattern = re.compile(fnmatch.translate(text))
+            if match:
+                return actions if isinstance(actions, str) else actions[match.lastgroup]
 
-        self._path_dispositions.append((pattern, action))
+        return None
 
     def should_include(self, relative_path: Union[Path, ZipInfo]) -> bool:
         """
@@ -401,10 +462,6 @@ class PackageConfiguration(object):
         :return: ``True`` if the path/entry should be included in the archive being
         built or ``False`` if not.
         """
-        if len(self._path_dispositions) == 0:
-            # If this is our first time, then create all our regular expressions.
-            self._build_path_dispositions()
-
         return self.get_path_disposition(relative_path) != 'exclude'
 
     def get_path_disposition(self, relative_path: Union[Path, ZipInfo]) -> Optional[str]:
@@ -413,22 +470,25 @@ class PackageConfiguration(object):
         The action returned will be one of ``exclude``, ``merge``, ``first``, ``last``,
         ``newest``, ``oldest``, ``largest``, ``smallest`` or ``None``.  With the exception
         of ``exclude`` all actions apply in the case where a file is encountered more than
-        once while building a jar.
+        once while building a jar.  Results are remembered by path since the same entries
+        tend to show up in many of the archives that go into a jar.
 
         :param relative_path: the relative ``Path`` or a ``ZipInfo``.
         :return: the disposition for the path or ``None``.
         """
-        if len(self._path_dispositions) == 0:
+        if not self._dispositions_built:
             # If this is our first time, then create all our regular expressions.
             self._build_path_dispositions()
 
-        text = str(relative_path) if isinstance(relative_path, Path) else relative_path.filename
+        # Archive entry names always use forward slashes so make sure paths do, too.
+        text = relative_path.filename if type(relative_path) is ZipInfo else relative_path.as_posix()
+        action = self._disposition_cache.get(text, _MISS)
 
-        for pattern, action in self._path_dispositions:
-            if pattern.match(text):
-                return action
+        if action is _MISS:
+            action = self._find_path_disposition(text)
+            self._disposition_cache[text] = action
 
-        return None
+        return action
 
     def package_sources(self, language_config: JavaConfiguration) -> bool:
         """
@@ -455,6 +515,76 @@ class PackageConfiguration(object):
         return language_config.type == 'library' if self.doc is None else self.doc
 
 
+@functools.lru_cache(maxsize=None)
+def _compile_excludes(excludes: Tuple[str, ...]) \
+        -> Tuple[FrozenSet[str], Optional[re.Pattern], Tuple[re.Pattern, ...]]:
+    """
+    A function that converts configured excludes into the forms we match paths
+    against.  Excludes that are plain file names rather than patterns are kept in a
+    set so they can be checked without any regular expression work at all.  File
+    name globs are combined into one regular expression.  Regular expressions given
+    with ``~`` are compiled on their own, since they may use inline flags or back
+    references that only work in a pattern of their own.
+
+    :param excludes: the configured exclude patterns.
+    :return: a tuple with the set of literal names to exclude, the combined glob
+    pattern or ``None``, if there are no globs, and the regular expression patterns.
+    """
+    literal_excludes = set()
+    alternatives = []
+    regexes = []
+
+    for text in excludes:
+        if text[0] == '~':
+            regexes.append(re.compile(text[1:]))
+        elif _glob_characters.search(text):
+            alternatives.append(fnmatch.translate(text))
+        else:
+            literal_excludes.add(text)
+
+    return frozenset(literal_excludes), re.compile('|'.join(alternatives)) if alternatives else None, tuple(regexes)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_duplicates(duplicates: Tuple[Tuple[str, str], ...]) \
+        -> Tuple[Tuple[re.Pattern, Union[str, Dict[str, str]]], ...]:
+    """
+    A function that converts configured duplicate handling rules into the form we
+    match paths against.  Each run of consecutive file name glob rules is combined
+    into one regular expression where each alternative is a named group; since the
+    leftmost alternative that matches wins, the first rule that applies to a path
+    decides its disposition.  Regular expressions given with ``~`` are compiled on
+    their own, since they may use inline flags or back references that only work in
+    a pattern of their own.  The resulting rules keep the configured order.
+
+    :param duplicates: the configured pattern and action pairs.
+    :return: the rules to check, in order.  Each is a pattern along with either the
+    action for a path that matches it or a map of group names to actions.
+    """
+    rules = []
+    alternatives = []
+    actions = {}
+
+    def add_globs():
+        if alternatives:
+            rules.append((re.compile('|'.join(alternatives)), dict(actions)))
+            alternatives.clear()
+            actions.clear()
+
+    for index, (text, action) in enumerate(duplicates):
+        if text[0] == '~':
+            add_globs()
+            rules.append((re.compile(text[1:]), action))
+        else:
+            name = f'rule{index}'
+            alternatives.append(f'(?P<{name}>{fnmatch.translate(text)})')
+            actions[name] = action
+
+    add_globs()
+
+    return tuple(rules)
+
+
 def get_javac_version() -> Tuple[Optional[str], Optional[int]]:
     """
     A function that shells out to the ``javac`` tool to determine the installed
@@ -467,22 +597,102 @@ def get_javac_version() -> Tuple[Optional[str], Optional[int]]:
     """
     try:
         process = checked_run(['javac', '-version'], 'Javac version check', capture=True)
-        version = process.stdout.decode().split(' ')[1].strip()
-        return version, int(version.split(".")[0])
     except FileNotFoundError:
         return None, None
 
+    # The output looks like "javac 16.0.1" so there's no need to decode all of it.
+    match = _javac_version_pattern.match(process.stdout)
+
+    if match is None:
+        return None, None
+
+    return match.group(1).decode('ascii'), int(match.group(2))
+
+
+def _get_release_version() -> Optional[str]:
+    """
+    A function that reads the version of the JDK that holds the ``javac`` tool on the
+    path from the JDK's ``release`` file.  This saves us from having to run ``javac``
+    just to ask it.
+
+    :return: the JDK version or ``None``, if ``javac`` is not on the path or the
+    version could not be read from the ``release`` file.
+    """
+    javac = shutil.which('javac')
+
+    if javac:
+        release_file = Path(javac).resolve().parent.parent / 'release'
+
+        try:
+            with release_file.open(encoding='utf-8') as fd:
+                for line in fd:
+                    if line.startswith('JAVA_VERSION='):
+                        return line[13:].strip().strip('"') or None
+        except OSError:
+            pass
+
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _installed_javac_version() -> Tuple[Optional[str], Optional[int]]:
+    """
+    A function that determines the version of the installed JDK the first time it is
+    called and remembers the answer from then on.  The JDK's ``release`` file is used
+    if we can find it; otherwise, we ask ``javac``.
+
+    :return: the same tuple that ``get_javac_version()`` returns.
+    """
+    version = _get_release_version()
+
+    if version:
+        return version, int(version.split('.', 1)[0])
+
+    return get_javac_version()
+
+
+def java_version() -> Optional[str]:
+    """
+    A function that returns the version of the installed JDK.
+
+    :return: the version of the installed JDK or ``None``, if it could not be
+    determined.
+    """
+    return _installed_javac_version()[0]
+
+
+def java_version_number() -> Optional[int]:
+    """
+    A function that returns the major version number of the installed JDK.
+
+    :return: the major version number of the installed JDK or ``None``, if it could
+    not be determined.
+    """
+    return _installed_javac_version()[1]
+
 
 def java_clean(language_config: JavaConfiguration):
     """
     A function that provides the implementation of the ``clean`` task for the Java
     language.  It deletes the configured build and distribution directory trees,
     if they exist.  It is not an error if either of the directories do not exist.
+    The two trees are removed at the same time unless one lives inside the other.
 
     :param language_config: the configured Java language information.
     """
-    remove_directory(language_config.build_dir())
-    remove_directory(language_config.dist_dir())
+    directories = (language_config.build_dir(), language_config.dist_dir())
+    build_dir, dist_dir = directories
+
+    if build_dir == dist_dir or build_dir in dist_dir.parents or dist_dir in build_dir.parents:
+        for directory in directories:
+            remove_directory(directory)
+    else:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Using list() here makes sure any failure is raised.
+            list(executor.map(remove_directory, directories))
+
+    # The directories we just removed may have been remembered as existing.
+    language_config.clear_directory_cache()
 
 
 def _add_verbose_options(options: List[str], *extras):
@@ -495,11 +705,10 @@ def _add_verbose_options(options: List[str], *extras):
     :param extras: any extra verbose-style options one of the Java command line
     tools will respond to.
     """
-    if global_options.verbose() > 1:
-        for extra in reversed(extras):
-            options.insert(0, extra)
-        if global_options.verbose() > 2:
-            options.insert(0, '-verbose')
+    verbose = global_options.verbose()
+
+    if verbose > 1:
+        options[:0] = ('-verbose', *extras) if verbose > 2 else extras
 
 
 def add_class_path(options: List[str], path_sets: List[DependencyPathSet], paths: List[Path] = None):
@@ -512,29 +721,69 @@ def add_class_path(options: List[str], path_sets: List[DependencyPathSet], paths
     :param paths: an optional list of paths to include in the class path.
     """
     if path_sets or paths:
-        path_strings = [] if paths is None else [str(path) for path in paths]
-        path_strings.extend([str(path_set.primary_path) for path_set in path_sets])
-        options.append('--class-path')
-        options.append(os.pathsep.join(path_strings))
+        path_strings = itertools.chain(
+            (os.fspath(path) for path in paths or ()),
+            (path_set.primary_path_str for path_set in path_sets)
+        )
+        options.extend(('--class-path', os.pathsep.join(path_strings)))
 
 
-def create_remote_resolver(group: Optional[str], name: str, version: Optional[str] = None) -> RemoteResolver:
+def _get_directory_url(group: Optional[str], name: str, version: Optional[str]) -> str:
     """
-    A function that creates a remote resolver based on the given information.
+    A function that builds the URL of the remote directory where the files for the
+    given group, name and version may be found.
 
     :param group: the group name to use.  If this is ``None``, then ``name`` will be used.
     :param name: the name to use.
     :param version: the version to use.
-    :return: an appropriately configured remote resolver.
+    :return: the URL of the remote directory.
     """
     group = group if group else name
-    group = group.replace('.', '/')
-    directory_url = f'https://repo1.maven.org/maven2/{group}/{name}'
+    # Groups repeat a lot across a dependency tree so keep just one copy of each path form.
+    group = sys.intern(group.replace('.', '/'))
+    directory_url = f'{_maven_repository_url}/{group}/{name}'
 
     if version:
         directory_url = f'{directory_url}/{version}'
 
-    return RemoteResolver(directory_url, Path(name))
+    return directory_url
+
+
+def create_remote_resolver(group: Optional[str], name: str, version: Optional[str] = None) -> RemoteResolver:
+    """
+    A function that creates a remote resolver based on the given information.
+
+    :param group: the group name to use.  If this is ``None``, then ``name`` will be used.
+    :param name: the name to use.
+    :param version: the version to use.
+    :return: an appropriately configured remote resolver.
+    """
+    return RemoteResolver(_get_directory_url(group, name, version), Path(name))
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_names(group: Optional[str], name: str, version: str, classifier: Optional[str],
+               version_in_url: bool) -> Tuple[str, Path, str, str]:
+    """
+    A function that builds the remote directory URL, local directory path and file
+    names for a dependency.  Dependencies show up many times while resolving a
+    project, so the results are remembered.  Sharing them is safe as strings and
+    paths are immutable.
+
+    :param group: the dependency's group.
+    :param name: the dependency's name.
+    :param version: the dependency's version.
+    :param classifier: the dependency's classifier, if it has one.
+    :param version_in_url: a flag noting whether the dependency version should be included
+    in the URL we build.
+    :return: a tuple containing the remote directory URL, the local directory path, a
+    classified base file name and a base file name.
+    """
+    directory_url = _get_directory_url(group, name, version if version_in_url else None)
+    base_name = f'{name}-{version}'
+    classified_name = f'{base_name}-{classifier}' if classifier else base_name
+
+    return directory_url, Path(name), classified_name, base_name
 
 
 def build_names(dependency: Dependency, version_in_url: bool = True) -> Tuple[RemoteResolver, str, str]:
@@ -547,16 +796,8 @@ def build_names(dependency: Dependency, version_in_url: bool = True) -> Tuple[Re
     :return: a tuple containing an appropriate remote resolver, a classified base file name
     and a base file name.
     """
-    resolver = create_remote_resolver(
-        dependency.group, dependency.name, dependency.version if version_in_url else None
+    directory_url, directory_path, classified_name, base_name = _get_names(
+        dependency.group, dependency.name, dependency.version, dependency.classifier, version_in_url
     )
-    name = dependency.name
-    version = dependency.version
-    classifier = dependency.classifier
-    base_name = f'{name}-{version}'
-    classified_name = f'{base_name}-{classifier}' if classifier else base_name
-
-    return resolver, classified_name, base_name
-
 
-java_version, java_version_number = get_javac_version()
+    return RemoteResolver(directory_url, directory_path), classified_name, base_name
@@ -2,14 +2,22 @@
 This file provides all our module file handling.
 """
 import json
-from collections import OrderedDict
+import stat
+import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 
 from builder import VERSION
 from builder.models import Dependency
-from builder.signing import supported_signatures
+from builder.signing import supported_signature_names
 
+try:
+    # orjson is optional; it's just a faster way to read and write module files.
+    # noinspection PyPackageRequirements
+    import orjson
+except ImportError:
+    orjson = None
 
 API_ELEMENTS = 'apiElements'
 RUNTIME_ELEMENTS = 'runtimeElements'
@@ -17,12 +25,46 @@ SHADOW_RUNTIME_ELEMENTS = 'shadowRuntimeElements'
 JAVADOC_ELEMENTS = 'javadocElements'
 SOURCE_ELEMENTS = 'sourcesElements'
 _attr_prefix = 'org.gradle.'
+_format_version = '1.1'
+
+
+@lru_cache(maxsize=None)
+def _attribute_name(name: str) -> str:
+    """
+    A function that returns the full, interned name for the given attribute name so
+    the same attribute name is shared across all the variants that use it.
+
+    :param name: the short name of the attribute.
+    :return: the attribute name with the ``org.gradle.`` prefix.
+    """
+    return sys.intern(f'{_attr_prefix}{name}')
+
+
+def _intern_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A function that copies a dictionary of attributes read from a module file,
+    interning the attribute names as it goes.  Module files repeat the same few
+    attribute names many times over.
+
+    :param attributes: the attributes to copy.
+    :return: the copy of the attributes.
+    """
+    return {sys.intern(name): value for name, value in attributes.items()}
+
+
+# Every component starts with these attributes so they are shared until replaced.
+# Nothing may modify this dictionary.
+_default_component_attributes = {
+    _attribute_name('status'): 'release'
+}
 
 
 class Component(object):
     """
     Instances of this class represent the component information in a module file.
     """
+    __slots__ = ('_group', '_module', '_version', '_attributes', '_endorse_strict_versions')
+
     @classmethod
     def from_dict(cls, content: Dict[str, Any]) -> 'Component':
         """
@@ -33,7 +75,7 @@ class Component(object):
         result = Component(content['group'], content['module'], content['version'])
 
         if 'attributes' in content:
-            result._attributes = OrderedDict(content['attributes'])
+            result._attributes = _intern_attributes(content['attributes'])
 
         return result
 
@@ -57,9 +99,7 @@ class Component(object):
         self._group = group
         self._module = module
         self._version = version
-        self._attributes = OrderedDict({
-            f'{_attr_prefix}status': 'release'
-        })
+        self._attributes = _default_component_attributes
         self._endorse_strict_versions = False
 
     @property
@@ -87,13 +127,16 @@ class Component(object):
         """
         A function to build a dictionary out of our data.
         """
-        result = OrderedDict(
-            group=self._group,
-            module=self._module,
-            version=self._version
-        )
+        result = {
+            'group': self._group,
+            'module': self._module,
+            'version': self._version
+        }
 
-        if self._attributes:
+        if self._attributes is _default_component_attributes:
+            # Callers get their own copy so they can't change the shared defaults.
+            result['attributes'] = dict(self._attributes)
+        elif self._attributes:
             result['attributes'] = self._attributes
 
         if self._endorse_strict_versions:
@@ -106,6 +149,8 @@ class VariantFile(object):
     """
     Instances of this class represent the information about a variant file.
     """
+    __slots__ = ('_name', '_url', '_size', '_signatures')
+
     @classmethod
     def from_dict(cls, content: Dict[str, Any]) -> 'VariantFile':
         """
@@ -116,9 +161,9 @@ class VariantFile(object):
         """
         result = VariantFile(content['name'], content['url'], content['size'])
 
-        for signature_name in supported_signatures:
-            if signature_name in content:
-                result._signatures[signature_name] = content[signature_name]
+        for name, value in content.items():
+            if name in supported_signature_names:
+                result._signatures[name] = value
 
         return result
 
@@ -130,7 +175,13 @@ class VariantFile(object):
         :param path: the path to create the variant file from.
         :return: the resulting variant file.
         """
-        size = path.stat().st_size if path.is_file() else 0
+        # One stat call tells us both whether we have a file and how big it is.
+        try:
+            path_stat = path.stat()
+            size = path_stat.st_size if stat.S_ISREG(path_stat.st_mode) else 0
+        except (FileNotFoundError, NotADirectoryError):
+            size = 0
+
         return VariantFile(path.name, path.name, size)
 
     def __init__(self, name: str, url: str, size: int):
@@ -142,7 +193,7 @@ class VariantFile(object):
         self._name = name
         self._url = url
         self._size = size
-        self._signatures: OrderedDict[str, str] = OrderedDict()
+        self._signatures: Dict[str, str] = {}
 
     @property
     def name(self):
@@ -175,20 +226,17 @@ class VariantFile(object):
 
         :param self: the new dictionary of known digital signatures for the file.
         """
-        if not isinstance(signatures, OrderedDict):
-            signatures = OrderedDict(signatures)
-
-        self._signatures = signatures
+        self._signatures = signatures if signatures.__class__ is dict else dict(signatures)
 
     def to_dict(self) -> Dict[str, Any]:
         """
         A function to build a dictionary out of our data.
         """
-        result = OrderedDict(
-            name=self._name,
-            url=self._url,
-            size=self._size
-        )
+        result = {
+            'name': self._name,
+            'url': self._url,
+            'size': self._size
+        }
 
         for signature_name, digital_signature in self._signatures.items():
             result[signature_name] = digital_signature
@@ -200,6 +248,8 @@ class Variant(object):
     """
     Instances of this class represent variant information in a module file.
     """
+    __slots__ = ('_name', '_attributes', '_dependencies', '_files')
+
     @classmethod
     def from_dict(cls, content: Dict[str, Any]) -> 'Variant':
         """
@@ -210,18 +260,25 @@ class Variant(object):
         result = Variant(content['name'])
 
         if 'attributes' in content:
-            result._attributes = OrderedDict(content['attributes'])
+            result._attributes = _intern_attributes(content['attributes'])
 
+        # Module files can carry many entries so the hot bits are bound locally.
         if 'dependencies' in content:
+            component_from_dict = Component.from_dict
+            append_dependency = result._dependencies.append
+
             for dependency in content['dependencies']:
-                component = Component.from_dict(dependency)
+                component = component_from_dict(dependency)
 
                 if component.version_is_string:
-                    result._dependencies.append(component)
+                    append_dependency(component)
 
         if 'files' in content:
+            file_from_dict = VariantFile.from_dict
+            append_file = result._files.append
+
             for file_info in content['files']:
-                result._files.append(VariantFile.from_dict(file_info))
+                append_file(file_from_dict(file_info))
 
         return result
 
@@ -232,7 +289,7 @@ class Variant(object):
         :param name: the name of the variant.
         """
         self._name = name
-        self._attributes: Optional[OrderedDict[str, Any]] = None
+        self._attributes: Optional[Dict[str, Any]] = None
         self._dependencies: List[Component] = []
         self._files: List[VariantFile] = []
 
@@ -254,8 +311,8 @@ class Variant(object):
         :param value: the value to set the attribute to.
         """
         if self._attributes is None:
-            self._attributes = OrderedDict()
-        self._attributes[f'{_attr_prefix}{name}'] = value
+            self._attributes = {}
+        self._attributes[_attribute_name(name)] = value
         return self
 
     def add_dependency(self, dependency: Dependency):
@@ -305,18 +362,18 @@ class Variant(object):
         """
         A function to build a dictionary out of our data.
         """
-        result = OrderedDict(
-            name=self._name
-        )
+        result = {
+            'name': self._name
+        }
 
         if self._attributes:
             result['attributes'] = self._attributes
 
-        if len(self._dependencies) > 0:
-            result['dependencies'] = [dependency.to_dict() for dependency in self._dependencies]
+        if self._dependencies:
+            result['dependencies'] = list(map(Component.to_dict, self._dependencies))
 
-        if len(self._files) > 0:
-            result['files'] = [variant_file.to_dict() for variant_file in self._files]
+        if self._files:
+            result['files'] = list(map(VariantFile.to_dict, self._files))
 
         return result
 
@@ -326,6 +383,8 @@ class ModuleData(object):
     Instances of this class represent a module file that provides metadata about a
     Java API.
     """
+    __slots__ = ('_format_version', '_component', '_variants', '_variants_by_name')
+
     @classmethod
     def from_path(cls, path: Path) -> 'ModuleData':
         """
@@ -334,17 +393,28 @@ class ModuleData(object):
 
         :param path: the path to read our content from.
         """
-        content = json.loads(path.read_text(encoding='utf-8'))
+        if orjson:
+            content = orjson.loads(path.read_bytes())
+        else:
+            content = json.loads(path.read_text(encoding='utf-8'))
+
         module_file = ModuleData()
 
-        if 'formatVersion' in content:
-            module_file._format_version = content['formatVersion']
+        module_file._format_version = content.get('formatVersion', _format_version)
 
         module_file._component = Component.from_dict(content['component'])
 
         if 'variants' in content:
-            for variant in content['variants']:
-                module_file._variants.append(Variant.from_dict(variant))
+            variant_from_dict = Variant.from_dict
+            append_variant = module_file._variants.append
+            index_variant = module_file._variants_by_name.setdefault
+
+            for variant_content in content['variants']:
+                variant = variant_from_dict(variant_content)
+
+                append_variant(variant)
+                # If a file names a variant more than once, the first one wins.
+                index_variant(variant.name, variant)
 
         return module_file
 
@@ -366,9 +436,10 @@ class ModuleData(object):
         """
         A function that creates an instance of the ``ModuleFile`` class.
         """
-        self._format_version = "1.1"
+        self._format_version = _format_version
         self._component: Optional[Component] = None
         self._variants: List[Variant] = []
+        self._variants_by_name: Dict[str, Variant] = {}
 
     def add_variant(self, name: str) -> Variant:
         """
@@ -377,12 +448,13 @@ class ModuleData(object):
         :param name: the name of the new variant.
         :return: the named variant or ``None`` if no such variant exists.
         """
-        if self.get_variant(name) is not None:
+        if name in self._variants_by_name:
             raise ValueError(f'There is already a variant known by the name {name}.')
 
         variant = Variant(name)
 
         self._variants.append(variant)
+        self._variants_by_name[name] = variant
 
         return variant
 
@@ -393,7 +465,7 @@ class ModuleData(object):
         :param name: the name of the desired variant.
         :return: the named variant or ``None`` if no such variant exists.
         """
-        return next((variant for variant in self._variants if variant.name == name), None)
+        return self._variants_by_name.get(name)
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -402,14 +474,14 @@ class ModuleData(object):
         :return: the contents of this set of module data as a dictionary.
         """
         component_data = self._component.to_dict() if self._component else {}
-        return OrderedDict(
-            formatVersion=self._format_version,
-            component=component_data,
-            createdBy=OrderedDict(
-                builder={"version": VERSION}
-            ),
-            variants=[variant.to_dict() for variant in self._variants]
-        )
+        return {
+            'formatVersion': self._format_version,
+            'component': component_data,
+            'createdBy': {
+                'builder': {'version': VERSION}
+            },
+            'variants': list(map(Variant.to_dict, self._variants))
+        }
 
     def write(self, path: Path):
         """
@@ -418,4 +490,8 @@ class ModuleData(object):
 
         :param path: the path to write our contents to.
         """
-        path.write_text(json.dumps(self.to_dict(), indent=2), encoding='utf-8')
+        if orjson:
+            path.write_bytes(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
+        else:
+            with path.open('w', encoding='utf-8') as fd:
+                json.dump(self.to_dict(), fd, indent=2, ensure_ascii=False)
@@ -1,58 +1,32 @@
 """
 This file provides all the support we need around the `jar` tool and packaging stuff.
 """
-import re
-import shutil
-import tempfile
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Sequence, Tuple, List, Dict, Union, Callable
-from zipfile import ZipFile, ZipInfo
+from typing import Optional, Sequence, Tuple, List, Dict, Union, Callable, Iterator
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
 
 from builder import VERSION
 from builder.models import DependencyPathSet
-from builder.java.describe import describe_classes
-from builder.java.java import _add_verbose_options, java_version, JavaConfiguration, PackageConfiguration, \
-    java_version_number
+from builder.java.describe import read_entry_point
+from builder.java.java import java_version, JavaConfiguration, PackageConfiguration, java_version_number
 from builder.java.modules import ModuleData, Component, Variant, API_ELEMENTS, RUNTIME_ELEMENTS, JAVADOC_ELEMENTS, \
     SOURCE_ELEMENTS
-from builder.signing import sign_path, sign_path_to_files
-from builder.utils import checked_run, TempTextFile, global_options
+from builder.signing import sign_path, sign_path_to_files, supported_signatures
+from builder.utils import global_options, verbose_out, get_matching_files
 
-_class_name_pattern = re.compile(r'^public.*? class ([.\w]+) ')
-
-
-def _build_jar_options(jar_path: Path, entry_point: Optional[str]) -> List[str]:
-    """
-    Build a list of the command line options we need to send to the ``jar`` tool.
-
-    :param jar_path: the path representing the jar file that is to be created.
-    :param entry_point: the entry point, if the jar is to be executable.
-    :return: the list of basic options for the ``jar`` command.
-    """
-    options = ['--create', '--file', str(jar_path)]
-
-    if entry_point:
-        options.append('--main-class')
-        options.append(entry_point)
-
-    # noinspection SpellCheckingInspection
-    _add_verbose_options(options)
-
-    return options
-
-
-def _include_directory(options: List[str], directory: Path):
-    """
-    A helper function for adding a directory inclusion into the set of options
-    for the ``jar`` tool.
-
-    :param options: the list of ``jar`` tool options to add to.
-    :param directory: the directory to include.
-    """
-    options.append('-C')
-    options.append(str(directory))
-    options.append('.')
+_manifest_directory = 'META-INF/'
+_manifest_name = 'META-INF/MANIFEST.MF'
+_manifest_line_length = 72
+_earliest_zip_date_time = (1980, 1, 1, 0, 0, 0)
+_entry_point_cache_name = 'entry_points.json'
+_package_digest_name = 'package_digest.json'
 
 
 def _get_packaging_dirs(language_config: JavaConfiguration) -> Tuple[Path, Path, Path, Path, Path]:
@@ -78,55 +52,115 @@ def _get_packaging_dirs(language_config: JavaConfiguration) -> Tuple[Path, Path,
     return code_dir, classes_dir, doc_dir, resources_dir, distribution_dir
 
 
-def _find_entry_point(classes_dir: Path, specified_entry_point: Optional[str]) -> str:
+def _get_cached_entry_points(classes_dir: Path, cache_path: Path) -> List[str]:
+    """
+    A function that returns the names of all the entry points among the compiled classes
+    under the given directory.  What we learn about each class file is saved, along with
+    its size and modification time, so only new or changed class files need to be
+    read the next time.
+
+    :param classes_dir: the directory of compiled classes to scan.
+    :param cache_path: the path to the file where what we know about class files is saved.
+    :return: the names of the entry points found.
+    """
+    try:
+        cache = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        cache = {}
+
+    if not isinstance(cache, dict):
+        cache = {}
+
+    known = {}
+    changed = False
+    class_files = sorted(get_matching_files(classes_dir, '**/*.class'))
+
+    for class_file in class_files:
+        key = class_file.as_posix()
+        path = classes_dir / class_file
+        stat_result = path.stat()
+        entry = cache.get(key)
+
+        if not isinstance(entry, list) or entry[:2] != [stat_result.st_mtime_ns, stat_result.st_size]:
+            entry = [stat_result.st_mtime_ns, stat_result.st_size, read_entry_point(path)]
+            changed = True
+
+        known[key] = entry
+
+    if changed or len(known) != len(cache):
+        cache_path.write_text(json.dumps(known), encoding='utf-8')
+
+    return [known[class_file.as_posix()][2] for class_file in class_files if known[class_file.as_posix()][2]]
+
+
+def _find_entry_point(classes_dir: Path, specified_entry_point: Optional[str], cache_path: Path) -> str:
     """
     A function that scans the directory tree rotted at the given directory for
     compiled Java class files that contain the typical Java entry point method.
     An entry point will always be returned; if one cannot be, an exception is
-    raised.  If an entry point is specified, it is validated as real.
+    raised.  If an entry point is specified, it is validated as real.  The class
+    file its name points to is checked first, so the rest need not be read.
 
     :param classes_dir: the directory of compiled classes to scan.
     :param specified_entry_point: an entry point specified by the user.
+    :param cache_path: the path to the file where what we know about class files is
+    saved between runs.
     :return: the entry point, validated or discovered.
     """
-    entry_points = []
+    if specified_entry_point:
+        class_file = classes_dir / f'{specified_entry_point.replace(".", "/")}.class'
 
-    for java_class in describe_classes(classes_dir):
-        if java_class.is_entry_point():
-            entry_points.append(java_class.name())
+        if class_file.is_file() and read_entry_point(class_file) == specified_entry_point:
+            return specified_entry_point
+
+    entry_points = set(_get_cached_entry_points(classes_dir, cache_path))
 
     if specified_entry_point:
         if specified_entry_point in entry_points:
             return specified_entry_point
+
         raise ValueError(f'Specified entry point {specified_entry_point} not found in compiled classes.')
 
+    if len(entry_points) > 1:
+        raise ValueError(
+            f'Too many entry points found: {", ".join(sorted(entry_points))}.  You will need to specify one.'
+        )
+
     if len(entry_points) == 0:
         raise ValueError('No entry point found for the application.')
 
-    if len(entry_points) > 1:
-        raise ValueError(f'Too many entry points found: {", ".join(entry_points)}.  You will need to specify one.')
+    return entry_points.pop()
 
-    return entry_points[0]
 
-
-def _create_manifest(version: str, description: str) -> Sequence[str]:
+def _create_manifest(version: str, description: str) -> bytes:
     """
-    A function that creates a basic manifest for a jar file based on information
-    from a project.
+    A function that creates the main attributes of a basic manifest for a jar file
+    based on information from a project.  They are returned already encoded, with
+    the line endings the jar file specification calls for.
 
     :param version: the version from a project.
     :param description: the description from a project.
-    :return: a sequence of lines that represent the generated manifest.
+    :return: the encoded lines of the generated manifest.
     """
-    result = [
-        'Manifest-Version: 1.0',
-        f'Created-By: {java_version} (Builder, v{VERSION})',
+    lines = (
         f'Specification-Title: {description}',
         f'Specification-Version: {version}',
         f'Implementation-Title: {description}',
         f'Implementation-Version: {version}'
-    ]
-    return result
+    )
+    return _manifest_header() + b''.join(map(_wrap_manifest_line, lines))
+
+
+@lru_cache(maxsize=1)
+def _manifest_header() -> bytes:
+    """
+    A function that returns the encoded lines that start every manifest we create.
+    These never change while we run, so they are built only once.
+
+    :return: the encoded lines that start a manifest.
+    """
+    return _wrap_manifest_line('Manifest-Version: 1.0') + \
+        _wrap_manifest_line(f'Created-By: {java_version()} (Builder, v{VERSION})')
 
 
 def _create_module_data() -> ModuleData:
@@ -158,7 +192,7 @@ def _set_file_attributes(variant: Variant, category: str, usage: str, docs_type:
         # noinspection SpellCheckingInspection
         variant.set_attr('docstype', docs_type)
     else:
-        variant.set_attr('jvm.version', java_version_number)
+        variant.set_attr('jvm.version', java_version_number())
         # noinspection SpellCheckingInspection
         variant.set_attr('libraryelements', 'jar')
 
@@ -190,12 +224,288 @@ def _add_variant(module_data: ModuleData, name: str, jar_file: Path, signatures:
             variant.add_dependency(path_set.dependency)
 
 
-def _run_packager(manifest: Optional[Sequence[str]], entry_point: Optional[str], jar_file: Path, source: Path,
-                  resources: Optional[Path]) -> Dict[str, str]:
+def _wrap_manifest_line(line: str) -> bytes:
     """
-    A function that executes the ``jar`` tool with appropriate parameters.  Once a jar
-    file is created, it is signed with all known digital signatures.  A map of signature
-    algorithm name to digital signature is returned for the generated jar file.
+    A function that encodes a single manifest line, wrapping it as the jar file
+    specification requires.  No physical line may be longer than 72 bytes and each
+    continuation line starts with a single space.  Multi-byte characters are never
+    split across lines.
+
+    :param line: the manifest line to encode.
+    :return: the encoded line, including its line terminator.
+    """
+    data = line.encode('utf-8')
+    parts = []
+    start = 0
+    limit = _manifest_line_length
+
+    while len(data) - start > limit:
+        end = start + limit
+
+        # Back up so we don't split a UTF-8 sequence.
+        while data[end] & 0xC0 == 0x80:
+            end = end - 1
+
+        parts.append(data[start:end])
+        start = end
+        limit = _manifest_line_length - 1
+
+    parts.append(data[start:])
+
+    return b'\r\n '.join(parts) + b'\r\n'
+
+
+def _manifest_content(manifest: Optional[bytes], entry_point: Optional[str]) -> bytes:
+    """
+    A function that produces the bytes of the manifest to store in a jar file.  If no
+    manifest is given, a minimal one is produced, just as the ``jar`` tool would do.
+
+    :param manifest: the encoded basic manifest to include in the jar file.
+    :param entry_point: an optional entry point to name in the manifest.
+    :return: the content of the manifest.
+    """
+    if not manifest:
+        manifest = _manifest_header()
+
+    if entry_point:
+        manifest = manifest + _wrap_manifest_line(f'Main-Class: {entry_point}')
+
+    return manifest + b'\r\n'
+
+
+def _digest(data: bytes) -> bytes:
+    """
+    A function that produces the digest we use to compare the content of jar entries.
+
+    :param data: the content to digest.
+    :return: the digest of the content.
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _new_entry_info(name: str, date_time: Tuple[int, int, int, int, int, int], external_attr: int,
+                    size: int) -> ZipInfo:
+    """
+    A function that creates the information for a new, compressed jar file entry.
+
+    :param name: the name of the entry.
+    :param date_time: the timestamp for the entry.
+    :param external_attr: the file attributes for the entry.
+    :param size: the uncompressed size of the entry.
+    :return: the entry information.
+    """
+    info = ZipInfo(name, max(date_time, _earliest_zip_date_time))
+    info.compress_type = ZIP_DEFLATED
+    info.external_attr = external_attr
+    info.file_size = size
+
+    return info
+
+
+def _file_entry_info(name: str, stat_result: os.stat_result) -> ZipInfo:
+    """
+    A function that creates the information for a new jar file entry that will hold
+    the content of a local file.
+
+    :param name: the name of the entry.
+    :param stat_result: the status of the local file.
+    :return: the entry information.
+    """
+    return _new_entry_info(
+        name, time.localtime(stat_result.st_mtime)[:6], (stat_result.st_mode & 0xFFFF) << 16, stat_result.st_size
+    )
+
+
+def _walk_tree(root: Union[Path, str], prefix: str = '') -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    A function that walks the directory sub-tree rooted at the given directory, in
+    sorted order so the same tree always produces the same jar.  Each directory and
+    file is reported with its name relative to the root, in the form a jar entry
+    needs, and its directory entry.  Directory names end with a slash.  The files in
+    a directory come before its sub-directories.  Directory entries remember what we
+    learn about them so callers do not need to go back to the file system.  A root
+    that does not exist is treated as empty; any other problem reading the tree is
+    raised so nothing is quietly left out.
+
+    :param root: the root of the directory tree to walk.
+    :param prefix: the prefix to put on each name.
+    :return: an iterator over tuples of relative name and directory entry.
+    """
+    try:
+        with os.scandir(root) as iterator:
+            entries = sorted(iterator, key=lambda item: item.name)
+    except FileNotFoundError:
+        if prefix:
+            raise
+        return
+
+    directories = []
+
+    for entry in entries:
+        if entry.is_dir():
+            directories.append(entry)
+        else:
+            yield prefix + entry.name, entry
+
+    for entry in directories:
+        name = f'{prefix}{entry.name}/'
+
+        yield name, entry
+        yield from _walk_tree(entry.path, name)
+
+
+class _JarBuilder(object):
+    """
+    Instances of this class write the entries of a jar file.  The manifest always comes
+    first and the parent directory entries for each file are added as they are needed,
+    just as the ``jar`` tool would have them.  A digest is kept of each file written so
+    that content seen again under the same name may be compared with it.  Entries that
+    may yet be replaced or merged are held in memory until the jar file is closed.  If
+    an exception occurs in its ``with`` context, the partial jar file is removed.
+    """
+    def __init__(self, jar_file: Path, manifest: Optional[bytes], entry_point: Optional[str],
+                 compression_level: Optional[int] = None):
+        self._jar_file = jar_file
+        self._jar = ZipFile(jar_file, 'w', ZIP_DEFLATED, compresslevel=compression_level)
+        self._digests: Dict[str, Optional[bytes]] = {}
+        self._held: Dict[str, Tuple[ZipInfo, bytes]] = {}
+
+        self.add_directory(_manifest_directory)
+        self._digests[_manifest_name] = None
+        self._jar.writestr(_manifest_name, _manifest_content(manifest, entry_point))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+        if exc_type is not None:
+            self._jar_file.unlink(missing_ok=True)
+
+    def _add_parents(self, name: str):
+        """
+        A function that makes sure that the directory entries for all the parents of
+        the named entry are present.
+
+        :param name: the name of the entry whose parents are needed.
+        """
+        parents = []
+        index = name.rfind('/', 0, len(name) - 1)
+
+        while index > 0:
+            parent = name[:index + 1]
+
+            if parent in self._digests:
+                break
+
+            parents.append(parent)
+            index = name.rfind('/', 0, index)
+
+        for parent in reversed(parents):
+            self._digests[parent] = None
+            self._jar.writestr(parent, b'')
+
+    def add_directory(self, name: str):
+        """
+        A function that adds a directory entry, if it is not already present.
+
+        :param name: the name of the directory entry.  It must end with a slash.
+        """
+        if name not in self._digests:
+            self._add_parents(name)
+            self._digests[name] = None
+            self._jar.writestr(name, b'')
+
+    def add_tree(self, root: Path):
+        """
+        A function that adds all the directories and files in the sub-tree rooted at
+        the given directory.  A file whose name is already present is skipped, as is
+        any manifest in the tree.
+
+        :param root: the root of the directory tree to add.
+        """
+        for name, entry in _walk_tree(root):
+            if name[-1] == '/':
+                self.add_directory(name)
+            elif name not in self._digests and name.upper() != _manifest_name:
+                self._add_parents(name)
+                self._digests[name] = None
+                verbose_out(f'adding: {name}', level=2)
+                self._jar.write(entry.path, name)
+
+    def has_entry(self, name: str) -> bool:
+        """
+        A function that tells whether an entry with the given name has been written.
+
+        :param name: the name of the entry to look for.
+        :return: ``True`` if the entry has been written or ``False`` if not.
+        """
+        return name in self._digests
+
+    def digest(self, name: str) -> Optional[bytes]:
+        """
+        A function that returns the digest of the content written for the named entry.
+
+        :param name: the name of the entry.
+        :return: the digest of the entry's content or ``None``, if it is not known.
+        """
+        return self._digests.get(name)
+
+    def write(self, info: ZipInfo, data: bytes):
+        """
+        A function that writes an entry to the jar file.
+
+        :param info: the information for the entry.
+        :param data: the content of the entry.
+        """
+        name = info.filename
+
+        self._add_parents(name)
+        self._digests[name] = _digest(data)
+        verbose_out(f'adding: {name}', level=2)
+        self._jar.writestr(info, data)
+
+    def get_held(self, name: str) -> Optional[Tuple[ZipInfo, bytes]]:
+        """
+        A function that returns the entry being held under the given name.
+
+        :param name: the name of the entry.
+        :return: a tuple of the entry information and content or ``None``, if no
+        entry is being held under the name.
+        """
+        return self._held.get(name)
+
+    def hold(self, info: ZipInfo, data: bytes):
+        """
+        A function that holds an entry in memory until the jar file is closed.  This
+        replaces any entry already held under the same name.
+
+        :param info: the information for the entry.
+        :param data: the content of the entry.
+        """
+        info.file_size = len(data)
+        self._held[info.filename] = info, data
+
+    def close(self):
+        """
+        A function that writes all held entries and closes the jar file.
+        """
+        try:
+            for info, data in self._held.values():
+                self.write(info, data)
+        finally:
+            self._held.clear()
+            self._jar.close()
+
+
+def _run_packager(manifest: Optional[bytes], entry_point: Optional[str], jar_file: Path, source: Path,
+                  resources: Optional[Path], compression_level: Optional[int] = None) -> Dict[str, str]:
+    """
+    A function that creates a jar file, the same way the ``jar`` tool would, but without
+    the cost of starting a JVM.  Once a jar file is created, it is signed with all known
+    digital signatures.  A map of signature algorithm name to digital signature is
+    returned for the generated jar file.
 
     :param manifest: the basic manifest to include in the generated jar file.
     :param entry_point: an optional entry point specified by the user.
@@ -203,24 +513,17 @@ def _run_packager(manifest: Optional[Sequence[str]], entry_point: Optional[str],
     :param source: the root directory of a sub-tree of files to include in the jar file.
     :param resources: the root directory of a sub-tree of resource files to include in
     the jar file.  This is optional.
+    :param compression_level: the deflate level to use, from 0 to 9.  If this is
+    ``None``, the ``zlib`` default is used.
     :return: the dictionary of digital signatures.
     """
-    options = _build_jar_options(jar_file, entry_point)
-
-    with TempTextFile() as temp_file:
-        if manifest:
-            temp_file.write_lines(manifest)
-            options.append('--manifest')
-            options.append(str(temp_file.file_name))
+    verbose_out(f'Packing: {jar_file}')
 
-        options.insert(0, 'jar')
-
-        _include_directory(options, source)
+    with _JarBuilder(jar_file, manifest, entry_point, compression_level) as builder:
+        builder.add_tree(source)
 
         if resources and resources.is_dir():
-            _include_directory(options, resources)
-
-        checked_run(options, 'Packing')
+            builder.add_tree(resources)
 
     return sign_path(jar_file)
 
@@ -256,9 +559,9 @@ def _get_path_size(source: Union[Path, ZipInfo]) -> int:
     return source.stat().st_size if isinstance(source, Path) else source.file_size
 
 
-def _get_file_action(source: Union[Path, ZipInfo], target_path: Path, action: str) -> str:
+def _get_file_action(source: Union[Path, ZipInfo], target: Union[Path, ZipInfo], action: str) -> str:
     """
-    A helper function that decides, based on the given action whether the target path
+    A helper function that decides, based on the given action whether the target entry
     should be merged, replaced, preserved or should produce an error.
     """
     if action == 'merge':
@@ -269,139 +572,135 @@ def _get_file_action(source: Union[Path, ZipInfo], target_path: Path, action: st
         return 'replace'
     if action == 'newest':
         source_value = _get_path_datetime(source)
-        target_value = _get_path_datetime(target_path)
+        target_value = _get_path_datetime(target)
 
         return 'preserve' if source_value < target_value else 'replace'
     if action == 'oldest':
         source_value = _get_path_datetime(source)
-        target_value = _get_path_datetime(target_path)
+        target_value = _get_path_datetime(target)
 
         return 'replace' if source_value < target_value else 'preserve'
     if action == 'largest':
         source_value = _get_path_size(source)
-        target_value = _get_path_size(target_path)
+        target_value = _get_path_size(target)
 
         return 'preserve' if source_value < target_value else 'replace'
     if action == 'smallest':
         source_value = _get_path_size(source)
-        target_value = _get_path_size(target_path)
+        target_value = _get_path_size(target)
 
         return 'replace' if source_value < target_value else 'preserve'
 
     return 'error'
 
 
-_current_language_config: Optional[JavaConfiguration] = None
-_current_task_config: Optional[PackageConfiguration] = None
-_current_source_root: Optional[Path] = None
-_duplicate_paths: List[str] = []
+class _PackagingContext(object):
+    """
+    Instances of this class carry the state for building one primary jar, so that
+    separate builds never share anything.
+    """
+    def __init__(self, builder: _JarBuilder, task_config: PackageConfiguration):
+        self.builder = builder
+        self.task_config = task_config
+        self.duplicate_paths: List[str] = []
 
 
-def _store_file(source: Union[Path, ZipInfo], target_path: Path, read_source: Callable[[], bytes],
-                copy_source: Callable[[], str]):
+def _store_entry(context: _PackagingContext, source: Union[Path, ZipInfo], info: ZipInfo,
+                 read_source: Callable[[], bytes]):
     """
-    A helper function that properly stores an individual file.  If the target does
-    not exist, the source is simply put in place.  If the target exists, it is
-    checked to see if it is merge-able and merged if so.  It is silently skipped if
-    the source and target match.  Otherwise, an exception is produced.
+    A helper function that properly stores an individual file in the jar being built.
+    If no entry by the same name exists, the source is simply added.  If one does, its
+    disposition decides whether it is merged with, replaces or is skipped in favor of
+    the existing entry.  With no disposition, it is silently skipped if the source and
+    entry match.  Otherwise, the path is noted as a duplicate.
 
+    :param context: the context for the jar we are creating.
     :param source: the relative ``Path`` or a ``ZipInfo`` which is the source.
-    :param target_path: the path where the file data is to be stored.
+    :param info: the information for the jar entry the source would become.
     :param read_source: a function that produces the content of the source as bytes.
-    :param copy_source: a function that does a straight copy of the source to the target.
     """
-    if _current_task_config.should_include(source):
-        if target_path.exists():
-            action = _get_file_action(source, target_path, _current_task_config.get_path_disposition(source))
-
-            if action == 'preserve':
-                pass
-            elif action == 'replace':
-                copy_source()
-            elif action == 'merge':
-                data = read_source()
-
-                if len(data) > 0:
-                    ch = data[-1]
-                    if ch != b'\n':
-                        data = data + b'\n'
-
-                target_path.write_bytes(data + target_path.read_bytes())
-            else:
-                if read_source() != target_path.read_bytes():
-                    text = str(source) if isinstance(source, Path) else source.filename
-                    _duplicate_paths.append(text)
-        else:
-            copy_source()
+    builder = context.builder
+    disposition = context.task_config.get_path_disposition(source)
+
+    if disposition == 'exclude':
+        return
+
+    name = info.filename
+    held = builder.get_held(name)
+
+    if held is not None:
+        held_info, held_data = held
+        action = _get_file_action(info, held_info, disposition)
+
+        if action == 'replace':
+            builder.hold(info, read_source())
+        elif action == 'merge':
+            data = read_source()
+
+            if not data.endswith(b'\n'):
+                data = data + b'\n'
+
+            builder.hold(held_info, data + held_data)
+        elif action == 'error' and read_source() != held_data:
+            text = str(source) if isinstance(source, Path) else source.filename
+            context.duplicate_paths.append(text)
+    elif builder.has_entry(name):
+        if builder.digest(name) != _digest(read_source()):
+            text = str(source) if isinstance(source, Path) else source.filename
+            context.duplicate_paths.append(text)
+    elif disposition is None:
+        builder.write(info, read_source())
+    else:
+        builder.hold(info, read_source())
 
 
-def _extract_archive(archive: Path, target: Path):
+def _add_archive(context: _PackagingContext, archive: Path, prefix: str):
     """
-    A function that extracts the contents of an archive (zip/jar) to the specified
-    directory.
+    A function that adds the contents of an archive (zip/jar) to the jar being built.
 
-    :param archive: the zip/jar archive to extract.
-    :param target: the target directory to write entries to.
+    :param context: the context for the jar we are creating.
+    :param archive: the zip/jar archive to add.
+    :param prefix: the prefix to put on the name of each entry from the archive.
     """
     with ZipFile(archive) as zip_file:
         for entry in zip_file.infolist():
+            name = prefix + entry.filename
+
             if entry.is_dir():
-                zip_file.extract(entry, target)
+                context.builder.add_directory(name)
             else:
-                target_path = target / entry.filename
-
-                _store_file(
-                    entry, target_path,
-                    lambda: zip_file.read(entry),
-                    lambda: zip_file.extract(entry, target)
-                )
-
-
-def _copy_local_file(source: str, target: str):
-    """
-    A function to copy a file as part of directory tree copying.  We wrap the typical
-    ``shutil.copy2()`` function to properly handle file collisions.
-
-    :param source: the source file to copy.
-    :param target: the target file to write.
-    """
-    source_path = Path(source)
-    relative_path = source_path.relative_to(_current_source_root)
-    target_path = Path(target)
+                info = _new_entry_info(name, entry.date_time, entry.external_attr, entry.file_size)
 
-    _store_file(
-        relative_path, target_path, source_path.read_bytes,
-        lambda: shutil.copy2(source, target)
-    )
+                _store_entry(context, entry, info, lambda: zip_file.read(entry))
 
 
-def _copy_tree(source: Path, target: Path):
+def _add_tree(context: _PackagingContext, root: Path, prefix: str):
     """
-    A helper function to copy a full directory tree from one place to another.
+    A function that adds the full directory tree under the given root to the jar
+    being built.
 
-    :param source: the root of the source tree to copy.
-    :param target: the root to copy the tree under.
+    :param context: the context for the jar we are creating.
+    :param root: the root of the source tree to add.
+    :param prefix: the prefix to put on the name of each entry from the tree.
     """
-    global _current_source_root
-
-    try:
-        _current_source_root = source
+    for name, entry in _walk_tree(root):
+        if name[-1] == '/':
+            context.builder.add_directory(prefix + name)
+        else:
+            info = _file_entry_info(prefix + name, entry.stat())
 
-        shutil.copytree(source, target, copy_function=_copy_local_file, dirs_exist_ok=True)
-    finally:
-        _current_source_root = None
+            _store_entry(context, Path(name), info, Path(entry.path).read_bytes)
 
 
 def _build_primary_jar(language_config: JavaConfiguration, task_config: PackageConfiguration,
                        dependencies: List[DependencyPathSet], classes_dir: Path,
                        resources_dir: Path, jar_file: Path) -> Dict[str, str]:
     """
-    A function that builds a temporary directory structure representing the desired
-    contents for a jar file and then creates it.  The directory structure is populated
-    by copying local files and expanding class path dependency jar files.  File collisions
-    will be handled as follows:
+    A function that builds the primary jar file for a project.  Entries are written
+    straight into the jar from local files and class path dependency jar files.  File
+    collisions will be handled as follows:
 
-    - If the source and target files are the same, the duplicate is ignored.
+    - If the source and existing entries are the same, the duplicate is ignored.
     - If the file may be merged (like service definitions), they are merged.
     - Otherwise, an error is produced.
 
@@ -412,53 +711,145 @@ def _build_primary_jar(language_config: JavaConfiguration, task_config: PackageC
     :param resources_dir: the directory containing the current project's resources.
     :return: the dictionary of digital signatures for the jar we created.
     """
-    global _current_language_config, _current_task_config, _current_source_root, _duplicate_paths
-
     project = global_options.project()
     manifest = _create_manifest(project.version, project.description)
-    entry_point = None if language_config.type != 'application' else \
-        _find_entry_point(classes_dir, task_config.get_entry_point())
+    entry_point = None if language_config.type != 'application' else _find_entry_point(
+        classes_dir, task_config.get_entry_point(), language_config.build_dir(ensure=True) / _entry_point_cache_name
+    )
 
-    # Build the jar contents from all our sources, handling duplicates as appropriate
-    with tempfile.TemporaryDirectory(dir=language_config.build_dir(ensure=True)) as temp_dir:
-        target_dir = Path(temp_dir) / 'jar_content'
+    verbose_out(f'Packing: {jar_file}')
 
-        try:
-            _current_language_config = language_config
-            _current_task_config = task_config
-            _duplicate_paths = []
-
-            _copy_tree(classes_dir, target_dir)
-            _copy_tree(resources_dir, target_dir)
-
-            for source, under in task_config.get_extra_content(language_config):
-                target = target_dir if under is None else target_dir / under
-
-                if source.is_dir():
-                    _copy_tree(source, target)
-                elif source.suffix == '.jar' or source.suffix == '.zip':
-                    _extract_archive(source, target)
-                else:
-                    _copy_local_file(str(source), str(target))
-
-            if task_config.include_dependencies(language_config):
-                for path_set in dependencies:
-                    if path_set.primary_path.is_dir():
-                        _copy_tree(path_set.primary_path, target_dir)
-                    elif path_set.primary_path.is_file():
-                        _extract_archive(path_set.primary_path, target_dir)
-
-            if len(_duplicate_paths) > 0:
-                lines = '\n    '.join(_duplicate_paths)
-                raise ValueError(
-                    f'Cannot package the following files.  All are duplicated but with different content:\n    {lines}'
+    # Build the jar from all our sources, handling duplicates as appropriate
+    with _JarBuilder(jar_file, manifest, entry_point, task_config.compression_level) as builder:
+        context = _PackagingContext(builder, task_config)
+
+        _add_tree(context, classes_dir, '')
+        _add_tree(context, resources_dir, '')
+
+        for source, under in task_config.get_extra_content(language_config):
+            prefix = '' if under is None else f'{under.as_posix().strip("/")}/'
+
+            if source.is_dir():
+                _add_tree(context, source, prefix)
+            elif source.suffix == '.jar' or source.suffix == '.zip':
+                _add_archive(context, source, prefix)
+            else:
+                _store_entry(
+                    context, Path(source.name), _file_entry_info(prefix + source.name, source.stat()),
+                    source.read_bytes
                 )
-        finally:
-            _current_language_config = None
-            _current_task_config = None
-            _duplicate_paths = []
 
-        return _run_packager(manifest, entry_point, jar_file, target_dir, None)
+        if task_config.include_dependencies(language_config):
+            for path_set in dependencies:
+                if path_set.primary_path.is_dir():
+                    _add_tree(context, path_set.primary_path, '')
+                elif path_set.primary_path.is_file():
+                    _add_archive(context, path_set.primary_path, '')
+
+        if len(context.duplicate_paths) > 0:
+            lines = '\n    '.join(context.duplicate_paths)
+            raise ValueError(
+                f'Cannot package the following files.  All are duplicated but with different content:\n    {lines}'
+            )
+
+    return sign_path(jar_file)
+
+
+def _add_tree_to_digest(hasher, root: Path):
+    """
+    A function that adds the names, sizes and modification times of everything in
+    the directory tree under the given root to a digest.
+
+    :param hasher: the digest to update.
+    :param root: the root of the directory tree to describe.
+    """
+    hasher.update(f'{root}\0'.encode('utf-8'))
+
+    for name, entry in _walk_tree(root):
+        stat_result = entry.stat()
+
+        hasher.update(f'{name}\0{stat_result.st_size}\0{stat_result.st_mtime_ns}\0'.encode('utf-8'))
+
+
+def _stat_text(path: Path) -> str:
+    """
+    A function that describes a file by its size and modification time.
+
+    :param path: the path to describe.
+    :return: the description of the file, or an empty string if it does not exist.
+    """
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return ''
+
+    return f'{stat_result.st_size}\0{stat_result.st_mtime_ns}'
+
+
+def _get_inputs_digest(language_config: JavaConfiguration, task_config: PackageConfiguration,
+                       dependencies: List[DependencyPathSet], trees: Sequence[Path]) -> str:
+    """
+    A function that produces a digest over everything that goes into packaging a
+    project: the configuration, the project details, the dependencies and the names,
+    sizes and modification times of every input file.  If the digest has not changed
+    since the last packaging, the existing jar files are still good.
+
+    :param language_config: the current Java language configuration information.
+    :param task_config: the current ``package`` task configuration information.
+    :param dependencies: the set of dependencies to account for.
+    :param trees: the directory trees whose content is packaged.
+    :return: the digest, as a string of hex digits.
+    """
+    project = global_options.project()
+    hasher = hashlib.sha256()
+    settings = (
+        VERSION, java_version(), project.name, project.version, project.description, language_config.type,
+        task_config.entry_point, task_config.fat_jar, task_config.include, task_config.exclude,
+        task_config.duplicates, task_config.sources, task_config.doc, task_config.compression_level
+    )
+
+    hasher.update(repr(settings).encode('utf-8'))
+
+    for tree in trees:
+        _add_tree_to_digest(hasher, tree)
+
+    for source, _ in task_config.get_extra_content(language_config):
+        if source.is_dir():
+            _add_tree_to_digest(hasher, source)
+        else:
+            hasher.update(f'{source}\0{_stat_text(source)}\0'.encode('utf-8'))
+
+    for path_set in dependencies:
+        dependency = path_set.dependency
+        path = path_set.primary_path
+
+        hasher.update(f'{dependency!r}\0{dependency.transient}\0{path}\0{_stat_text(path)}\0'.encode('utf-8'))
+
+    return hasher.hexdigest()
+
+
+def _is_up_to_date(digest_path: Path, digest: str, outputs: Sequence[Path]) -> bool:
+    """
+    A function that tells whether the outputs of a previous packaging are still good.
+    They are if they all exist and were built from inputs with the given digest.  The
+    global ``--force-build`` option makes this always answer ``False``.
+
+    :param digest_path: the path to the file where the digest of the inputs for the
+    last packaging was saved.
+    :param digest: the digest of the current inputs.
+    :param outputs: the files the packaging produces.
+    :return: ``True`` if there is nothing to do or ``False`` if packaging must be
+    done.
+    """
+    if global_options.force_build():
+        return False
+
+    try:
+        saved_digest = json.loads(digest_path.read_text(encoding='utf-8'))['digest']
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+    return saved_digest == digest and all(output.is_file() for output in outputs)
 
 
 def java_package(language_config: JavaConfiguration, task_config: PackageConfiguration,
@@ -476,38 +867,80 @@ def java_package(language_config: JavaConfiguration, task_config: PackageConfigu
     project = global_options.project()
     code_dir, classes_dir, doc_dir, resources_dir, output_dir = _get_packaging_dirs(language_config)
     output_dir = output_dir / project.name
-    jar_file = output_dir / f'{project.name}-{project.version}.jar'
+    base_name = f'{project.name}-{project.version}'
+    jar_file = output_dir / f'{base_name}.jar'
     module_data = _create_module_data()
+    package_doc = task_config.package_doc(language_config)
+    package_sources = task_config.package_sources(language_config)
+    doc_jar_file = output_dir / f'{base_name}-javadoc.jar'
+    sources_jar_file = output_dir / f'{base_name}-sources.jar'
+    module_path = output_dir / f'{base_name}.module'
+    digest_path = language_config.build_dir(ensure=True) / _package_digest_name
+    trees = [classes_dir, resources_dir]
+    outputs = [jar_file, module_path]
 
-    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs.extend(module_path.parent / f'{module_path.name}.{name}' for name in supported_signatures)
 
-    signatures = _build_primary_jar(language_config, task_config, dependencies, classes_dir, resources_dir, jar_file)
+    if package_doc:
+        trees.append(doc_dir)
+        outputs.append(doc_jar_file)
 
-    _add_variant(module_data, API_ELEMENTS, jar_file, signatures, "library", "api", None, dependencies)
-    _add_variant(module_data, RUNTIME_ELEMENTS, jar_file, signatures, "library", "runtime", None, dependencies)
+    if package_sources:
+        trees.append(code_dir)
+        outputs.append(sources_jar_file)
 
-    if task_config.package_doc(language_config):
-        if not doc_dir.is_dir():
-            raise ValueError(f'Cannot build a JavaDoc archive since {doc_dir} does not exist.')
+    digest = _get_inputs_digest(language_config, task_config, dependencies, trees)
 
-        jar_file = output_dir / f'{project.name}-{project.version}-javadoc.jar'
+    if _is_up_to_date(digest_path, digest, outputs):
+        verbose_out(f'Packaging for {project.name} is up to date.')
+        return
 
-        signatures = _run_packager(None, None, jar_file, doc_dir, None)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    digest_path.unlink(missing_ok=True)
+
+    # The jars are independent of each other so we build them concurrently.  The
+    # module data is only ever touched here, though.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        primary = executor.submit(
+            _build_primary_jar, language_config, task_config, dependencies, classes_dir, resources_dir, jar_file
+        )
+        doc = None
+        sources = None
+
+        if package_doc:
+            if not doc_dir.is_dir():
+                raise ValueError(f'Cannot build a JavaDoc archive since {doc_dir} does not exist.')
 
-        _add_variant(module_data, JAVADOC_ELEMENTS, jar_file, signatures, "documentation", "runtime", 'javadoc', [])
+            doc = executor.submit(
+                _run_packager, None, None, doc_jar_file, doc_dir, None, task_config.compression_level
+            )
 
-    if task_config.package_sources(language_config):
-        if not code_dir.is_dir():
-            raise ValueError(f'Cannot build a sources archive since {code_dir} does not exist.')
+        if package_sources:
+            if not code_dir.is_dir():
+                raise ValueError(f'Cannot build a sources archive since {code_dir} does not exist.')
 
-        jar_file = output_dir / f'{project.name}-{project.version}-sources.jar'
+            sources = executor.submit(
+                _run_packager, None, None, sources_jar_file, code_dir, resources_dir, task_config.compression_level
+            )
 
-        signatures = _run_packager(None, None, jar_file, code_dir, resources_dir)
+        signatures = primary.result()
 
-        _add_variant(module_data, SOURCE_ELEMENTS, jar_file, signatures, "documentation", "runtime", 'sources', [])
+        _add_variant(module_data, API_ELEMENTS, jar_file, signatures, "library", "api", None, dependencies)
+        _add_variant(module_data, RUNTIME_ELEMENTS, jar_file, signatures, "library", "runtime", None, dependencies)
 
-    module_path = output_dir / f'{project.name}-{project.version}.module'
+        if doc:
+            _add_variant(
+                module_data, JAVADOC_ELEMENTS, doc_jar_file, doc.result(), "documentation", "runtime", 'javadoc', []
+            )
+
+        if sources:
+            _add_variant(
+                module_data, SOURCE_ELEMENTS, sources_jar_file, sources.result(), "documentation", "runtime",
+                'sources', []
+            )
 
     module_data.write(module_path)
 
     sign_path_to_files(module_path)
+
+    digest_path.write_text(json.dumps({'digest': digest}), encoding='utf-8')
@@ -3,15 +3,15 @@ This file provides all our POM file handling.
 """
 import re
 from pathlib import Path
-from typing import Dict, Optional, List, Generator, Tuple
+from typing import Dict, Optional, List, Tuple, Match
 
 from builder.java.java import create_remote_resolver
 from builder.models import Dependency, DependencyContext
 from builder.java.xml_support import parse_xml_file, XmlElement
-from builder.utils import global_options
 
-_var_pattern = re.compile(r'[$]{(.*?)[}]')
+_var_pattern = re.compile(r'[$]{([^}]*)[}]')
 _excluded_scopes = ['test', 'provided', 'system']
+_pom_cache: Dict[Tuple[str, int], 'POMFile'] = {}
 
 
 def _get_pom_properties(root: XmlElement) -> Dict[str, str]:
@@ -42,6 +42,10 @@ class POMFile(object):
         """
         self._root = parse_xml_file(path)
         self._properties = _get_pom_properties(self._root)
+        self._management_dependencies: Optional[List[XmlElement]] = None
+        self._dependencies: Optional[List[XmlElement]] = None
+        self._management_versions: Optional[Dict[Tuple[str, str], Optional[str]]] = None
+        self._dependency_versions: Optional[Dict[Tuple[str, str], Optional[str]]] = None
         self._imported = self._get_imported_dependencies(context)
         self._parent = self._get_parent(context)
         self._group_id = self._get_element_text(self._root.find('groupId'))
@@ -91,7 +95,7 @@ class POMFile(object):
             resolver = create_remote_resolver(group, name, version)
             pom_path = resolver.resolve(f'{name}-{version}.pom')
 
-            parent = POMFile(pom_path, context)
+            parent = _load_pom(pom_path, context)
 
         return parent
 
@@ -113,7 +117,7 @@ class POMFile(object):
                 resolver = create_remote_resolver(group, name, version)
                 pom_path = resolver.resolve(f'{name}-{version}.pom')
 
-                result.append(POMFile(pom_path, context))
+                result.append(_load_pom(pom_path, context))
 
         return result
 
@@ -138,10 +142,19 @@ class POMFile(object):
         `None` if no element was provided.
         """
         text = self._get_element_text(element)
-        if text:
-            text = global_options.substitute(text, extras=self._properties, ignore_global_vars=True)
+        if text and '${' in text:
+            text = _var_pattern.sub(self._property_value, text)
         return text
 
+    def _property_value(self, match: Match[str]) -> str:
+        """
+        A helper that returns the value of the property named by a property reference.
+
+        :param match: the match for the property reference.
+        :return: the value of the property or the empty string, if it has no value.
+        """
+        return self._properties.get(match.group(1).strip()) or ''
+
     def get_element_value(self, element: XmlElement, tag: str) -> Optional[str]:
         """
         A function that accepts a parent element, looks for an immediate child element
@@ -180,31 +193,88 @@ class POMFile(object):
         """
         return self.get_element_value(dependency, 'optional') == 'true'
 
-    def management_dependencies(self) -> Generator[XmlElement, None, None]:
+    def management_dependencies(self) -> List[XmlElement]:
+        """
+        A function that returns the POM file's ``dependency`` elements that are listed
+        under its ``dependencyManagement`` element.  The list is built the first time
+        it is asked for.
+
+        :return: the list of managed dependency elements.
+        """
+        if self._management_dependencies is None:
+            self._management_dependencies = []
+
+            for dependencyManagement in self._root.findall('dependencyManagement'):
+                for dependency_list in dependencyManagement.findall('dependencies'):
+                    for dependency in dependency_list.findall('dependency'):
+                        scope = self.get_element_value(dependency, 'scope')
+
+                        if scope not in _excluded_scopes and not self.is_optional(dependency):
+                            self._management_dependencies.append(dependency)
+
+        return self._management_dependencies
+
+    def dependencies(self) -> List[XmlElement]:
         """
-        A function that returns a generator over the POM file's ``dependency`` elements
-        that are listed under its ``dependencyManagement`` element.
+        A function that returns the POM file's listed ``dependency`` elements.  The list
+        is built the first time it is asked for.
+
+        :return: the list of dependency elements.
         """
-        for dependencyManagement in self._root.findall('dependencyManagement'):
-            for dependency_list in dependencyManagement.findall('dependencies'):
-                for dependency in dependency_list.findall('dependency'):
+        if self._dependencies is None:
+            self._dependencies = []
+
+            for dependencies in self._root.findall('dependencies'):
+                for dependency in dependencies.findall('dependency'):
                     scope = self.get_element_value(dependency, 'scope')
+                    dep_type = self.get_element_value(dependency, 'type')
+
+                    if scope not in _excluded_scopes and not self.is_optional(dependency) and dep_type != 'tar.gz':
+                        self._dependencies.append(dependency)
+
+        return self._dependencies
+
+    def _get_versions(self, dependencies: List[XmlElement]) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        A helper function that maps the group and name of each of the given dependency
+        elements to its version.  When the same group and name appear more than once,
+        the first version wins.
+
+        :param dependencies: the dependency elements to map.
+        :return: the dictionary of group and name to version.
+        """
+        result = {}
+
+        for dependency in dependencies:
+            group, name, version = self.get_dependency_info(dependency)
 
-                    if scope not in _excluded_scopes and not self.is_optional(dependency):
-                        yield dependency
+            result.setdefault((group, name), version)
 
-    def dependencies(self) -> Generator[XmlElement, None, None]:
+        return result
+
+    def management_versions(self) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        A function that returns the versions of the POM file's managed dependencies,
+        keyed by group and name.
+
+        :return: the dictionary of group and name to version.
+        """
+        if self._management_versions is None:
+            self._management_versions = self._get_versions(self.management_dependencies())
+
+        return self._management_versions
+
+    def dependency_versions(self) -> Dict[Tuple[str, str], Optional[str]]:
         """
-        A function that returns a generator over the POM file's listed ``dependency``
-        elements.
+        A function that returns the versions of the POM file's listed dependencies,
+        keyed by group and name.
+
+        :return: the dictionary of group and name to version.
         """
-        for dependencies in self._root.findall('dependencies'):
-            for dependency in dependencies.findall('dependency'):
-                scope = self.get_element_value(dependency, 'scope')
-                dep_type = self.get_element_value(dependency, 'type')
+        if self._dependency_versions is None:
+            self._dependency_versions = self._get_versions(self.dependencies())
 
-                if scope not in _excluded_scopes and not self.is_optional(dependency) and dep_type != 'tar.gz':
-                    yield dependency
+        return self._dependency_versions
 
     def resolve_version(self, group: str, name: str, version: Optional[str]) -> Optional[str]:
         """
@@ -221,25 +291,52 @@ class POMFile(object):
         :param version: the version, which may be ``None``.
         """
         if not version:
+            key = (group, name)
+
             for pom_file in self._imported:
-                for dependency in pom_file.management_dependencies():
-                    dep_group, dep_name, dep_version = pom_file.get_dependency_info(dependency)
+                versions = pom_file.management_versions()
 
-                    if dep_group == group and dep_name == name:
-                        return dep_version
+                if key in versions:
+                    return versions[key]
 
             if self._parent:
-                for dependency in self._parent.dependencies():
-                    dep_group, dep_name, dep_version = self._parent.get_dependency_info(dependency)
+                versions = self._parent.dependency_versions()
 
-                    if dep_group == group and dep_name == name:
-                        return dep_version
+                if key in versions:
+                    return versions[key]
 
                 return self._parent.resolve_version(group, name, version)
 
         return version
 
 
+def _load_pom(path: Path, context: DependencyContext) -> POMFile:
+    """
+    A function that loads a POM file.  Loaded POM files are cached, so a POM file that
+    many others share, such as a common parent, is parsed only once.  The key includes
+    the modification time of the file so a changed POM file is always read again.
+
+    :param path: the path to the POM file.
+    :param context: the dependency context currently in play.
+    :return: the loaded POM file.
+    """
+    key = str(path.absolute()), path.stat().st_mtime_ns
+    pom_file = _pom_cache.get(key)
+
+    if pom_file is None:
+        pom_file = POMFile(path, context)
+        _pom_cache[key] = pom_file
+
+    return pom_file
+
+
+def clear_pom_cache():
+    """
+    A function that clears our cache of loaded POM files.
+    """
+    _pom_cache.clear()
+
+
 def read_pom_for_dependencies(pom_path: Path, context: DependencyContext, parent_dependency: Dependency):
     """
     A function that reads a POM file for transient dependencies and includes them into
@@ -250,7 +347,7 @@ def read_pom_for_dependencies(pom_path: Path, context: DependencyContext, parent
     :param parent_dependency: the dependency to which the POM file belongs.
     :return: the list of dependencies found in the POM file, if any.
     """
-    pom_file = POMFile(pom_path, context)
+    pom_file = _load_pom(pom_path, context)
 
     for dependency in pom_file.dependencies():
         group, name, version = pom_file.get_dependency_info(dependency)
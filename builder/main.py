@@ -20,13 +20,15 @@ from builder.utils import global_options, end, out
 @click.option('--force-fetch', '-f', is_flag=True,
               help="Do not read from the local file cache; always download dependencies. This still updates the local "
                    "file cache.")
+@click.option('--force-build', '-b', is_flag=True,
+              help="Do all task work, even where the results of an earlier run appear to be up to date.")
 @click.option('--set', '-s', 'set_var', multiple=True, metavar='<name=value[,...]>',
               help='Set a global variable to a value.  This is typically used to provide input data to a task.  '
                    'Allowed names of variables are determined by tasks that support them.  The value of this option '
                    'may be a comma-separated list of "name=value" pairs and/or the option may repeated.')
 @click.version_option(version=VERSION, help="Show the version of builder and exit.")
 @click.argument('tasks', nargs=-1)
-def cli(quiet, verbose, directory, language, no_requires, force_fetch, set_var, tasks):
+def cli(quiet, verbose, directory, language, no_requires, force_fetch, force_build, set_var, tasks):
     """
     Use this tool to build things based on a language.
 
@@ -40,6 +42,7 @@ def cli(quiet, verbose, directory, language, no_requires, force_fetch, set_var,
         set_languages(language).\
         set_independent_tasks(no_requires).\
         set_force_remote_fetch(force_fetch).\
+        set_force_build(force_build).\
         set_vars(set_var).\
         set_tasks(tasks)
 
@@ -1,6 +1,7 @@
 """
 This library provides our core data model.
 """
+import os
 import re
 from collections import OrderedDict
 from pathlib import Path
@@ -428,6 +429,7 @@ class DependencyPathSet(object):
         """
         self._dependency = dependency
         self._primary_path = primary_file
+        self._primary_path_str: Optional[str] = None
         self._secondary_paths: Dict[str, Path] = {}
 
     @property
@@ -448,6 +450,18 @@ class DependencyPathSet(object):
         """
         return self._primary_path
 
+    @property
+    def primary_path_str(self) -> str:
+        """
+        A read-only property that returns the primary path of the dependency as a
+        string.  This is handy for building command lines.
+
+        :return: the dependency's primary file, as a string.
+        """
+        if self._primary_path_str is None:
+            self._primary_path_str = os.fspath(self._primary_path)
+        return self._primary_path_str
+
     def add_secondary_path(self, key: str, path: Path):
         """
         This function is used to add a secondary path to the dependency file set.
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Dict, Callable, Optional
 
 supported_signatures = ['sha512', 'sha256', 'sha1', 'md5']
+supported_signature_names = frozenset(supported_signatures)
 FetchFileFunction = Callable[[str], Optional[Path]]
 
 
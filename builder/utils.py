@@ -13,7 +13,7 @@ import click
 
 PathSequence = Union[Sequence[Path], Sequence[str]]
 T = TypeVar("T")
-_var_pattern = re.compile(r'[$]{(.*?)[}]')
+_var_pattern = re.compile(r'[$]{([^}]*)[}]')
 _template_pattern = re.compile(r'[{][{](.*?)[}][}]')
 
 # Types for function references.
@@ -39,6 +39,7 @@ class GlobalOptions(object):
         self._verbose = 0
         self._independent_tasks = False
         self._force_remote_fetch = False
+        self._force_build = False
         self._languages = ()
         self._vars = {}
         self._tasks = ()
@@ -92,6 +93,18 @@ class GlobalOptions(object):
         self._force_remote_fetch = value
         return self
 
+    def set_force_build(self, value: bool) -> 'GlobalOptions':
+        """
+        This function sets whether or not the user is requesting that tasks redo their
+        work, even if what they produced earlier appears to be up to date.  If this is
+        ``True``, tasks will not skip work based on the state of earlier outputs.
+
+        :param value: whether or not up to date checks should be bypassed.
+        :return: this object, for fluency.
+        """
+        self._force_build = value
+        return self
+
     def set_languages(self, value: Sequence[str]) -> 'GlobalOptions':
         """
         This function sets any extra languages specified by the user to include in the
@@ -186,6 +199,16 @@ class GlobalOptions(object):
         """
         return self._force_remote_fetch
 
+    def force_build(self) -> bool:
+        """
+        This function returns whether or not the user has requested that tasks redo their
+        work, even if what they produced earlier appears to be up to date.  If this is
+        ``True``, tasks will not skip work based on the state of earlier outputs.
+
+        :return: whether or not up to date checks should be bypassed.
+        """
+        return self._force_build
+
     def languages(self) -> Sequence[str]:
         """
         This function returns any extra languages specified by the user to include in
@@ -318,12 +341,10 @@ class TempTextFile(object):
         :param lines: an iterable collection of lines to write to the temporary file.
         """
         with self.file_name.open("w", encoding='utf-8') as fd:
-            fd.write('\n'.join(lines))
-            fd.write('\n')
+            fd.write('\n'.join(lines) + '\n')
 
     def _remove(self):
-        if self.file_name.exists():
-            self.file_name.unlink()
+        self.file_name.unlink(missing_ok=True)
 
 
 def find(sequence: Iterable[T], predicate: Callable[[T], bool]) -> Optional[T]:
@@ -374,12 +395,25 @@ def remove_directory(directory: Path):
     :param directory: the directory to remove.
     """
     if directory.is_dir():
-        for path in directory.iterdir():
-            if path.is_file():
-                path.unlink()
-            elif path.is_dir():
-                remove_directory(path)
-        directory.rmdir()
+        _remove_tree(os.fspath(directory))
+
+
+def _remove_tree(directory: str):
+    """
+    A helper function for removing a directory tree.  We work with ``os.scandir()``
+    entries directly since they already know whether they are directories, which saves
+    a ``stat`` call for each item.  Symbolic links are removed, never followed.
+
+    :param directory: the directory to remove.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _remove_tree(entry.path)
+            else:
+                os.unlink(entry.path)
+
+    os.rmdir(directory)
 
 
 def out(text: str = '', respect_quiet: bool = True, **kwargs):
@@ -456,7 +490,7 @@ def end(*args, label: str = 'ERROR', rc=1):
 
 
 def checked_run(args: Sequence[str], action: str, capture: bool = False, cwd: Path = None,
-                allowed_rcs: Optional[Sequence[int]] = None) -> subprocess.CompletedProcess:
+                allowed_rcs: Optional[Sequence[int]] = None, text: bool = False) -> subprocess.CompletedProcess:
     """
     This function invokes the specified command line as a subprocess.  If the
     subprocess fails (i.e., returns with a non-zero return code), execution is
@@ -470,13 +504,15 @@ def checked_run(args: Sequence[str], action: str, capture: bool = False, cwd: Pa
     :param allowed_rcs: a sequence of allowed return codes.  If it is None (the
     default), the only allowed return code is 0.  Provide an empty sequence to
     allow any return code.  A return code of 0 is always acceptable.
+    :param text: whether captured output should be decoded to strings rather than
+    returned as bytes.
     :return: the CompletedProcess instance from running the command.
     """
     if allowed_rcs is None:
         allowed_rcs = []
 
     verbose_out(f'Running: {" ".join(args)}')
-    completed_process = _run_subprocess(args, capture_output=capture, cwd=cwd)
+    completed_process = _run_subprocess(args, capture_output=capture, cwd=cwd, text=text)
     rc = completed_process.returncode
 
     if rc != 0 and rc not in allowed_rcs:
@@ -26,6 +26,9 @@ setup(
     install_requires=[
         'click', 'requests', 'PyYAML', 'stringcase'
     ],
+    extras_require={
+        'fast': ['orjson']
+    },
     python_requires='>=3.9.0',
     entry_points='''
         [console_scripts]
@@ -2,13 +2,20 @@
 This file contains all the unit tests for our basic Java support.
 """
 import os
-from pathlib import Path
+from pathlib import Path, PureWindowsPath
 from subprocess import CompletedProcess
-from typing import Tuple, Callable, Sequence
+from typing import Tuple, Callable, Sequence, Optional
+from zipfile import ZipInfo
+
+# noinspection PyPackageRequirements
+import pytest
 
 from builder.java import JavaConfiguration, PackageConfiguration, get_javac_version
+# Aliased so pytest doesn't try to collect it as a test class.
+from builder.java.java import TestingConfiguration as JavaTestingConfiguration
 # noinspection PyProtectedMember
-from builder.java.java import _add_verbose_options, add_class_path, build_names
+from builder.java.java import _add_verbose_options, add_class_path, build_names, java_clean, \
+    _get_release_version
 from builder.models import Dependency, DependencyPathSet, RemoteResolver
 from builder.project import Project
 from tests.test_support import Options, FakeProcess, FakeProcessContext
@@ -24,72 +31,112 @@ class TestJavaConfig(object):
             return directory, JavaConfiguration(), PackageConfiguration()
 
     @staticmethod
-    def _verify_path_attr(directory: Path, config: JavaConfiguration, attr_name: str,
+    def _verify_path_attr(directory: Path, config: JavaConfiguration, name: str,
                           accessor: Callable[[], Path], *path_parts: str):
         expected = directory
 
         for part in path_parts:
             expected = expected / Path(getattr(config, part))
 
-        assert getattr(config, attr_name) is None
+        # noinspection PyProtectedMember
+        assert name not in config._directories
 
         result = accessor()
 
         assert isinstance(result, Path)
         assert result == expected
-        assert getattr(config, attr_name) == expected
+        # noinspection PyProtectedMember
+        assert config._directories[name] == (expected, False, False)
 
     def test_code_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_code_dir', config.code_dir, 'source', 'code_source')
+        self._verify_path_attr(directory, config, 'code', config.code_dir, 'source', 'code_source')
 
     def test_resources_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_resources_dir', config.resources_dir, 'source', 'code_resources')
+        self._verify_path_attr(directory, config, 'resources', config.resources_dir, 'source', 'code_resources')
 
     def test_tests_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_tests_dir', config.tests_dir, 'source', 'tests_source')
+        self._verify_path_attr(directory, config, 'tests', config.tests_dir, 'source', 'tests_source')
 
     def test_test_resources_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
         self._verify_path_attr(
-            directory, config, '_test_resources_dir', config.test_resources_dir, 'source', 'test_resources'
+            directory, config, 'test_resources', config.test_resources_dir, 'source', 'test_resources'
         )
 
     def test_build_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_build_dir', config.build_dir, 'build')
+        self._verify_path_attr(directory, config, 'build', config.build_dir, 'build')
 
     def test_classes_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_classes_dir', config.classes_dir, 'build', 'code_target')
+        self._verify_path_attr(directory, config, 'classes', config.classes_dir, 'build', 'code_target')
 
     def test_doc_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_doc_dir', config.doc_dir, 'build', 'code_doc')
+        self._verify_path_attr(directory, config, 'doc', config.doc_dir, 'build', 'code_doc')
 
     def test_dist_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_dist_dir', config.dist_dir, 'dist')
+        self._verify_path_attr(directory, config, 'dist', config.dist_dir, 'dist')
 
     def test_library_dist_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_lib_dir', config.library_dist_dir, 'dist', 'lib_target')
+        self._verify_path_attr(directory, config, 'library_dist', config.library_dist_dir, 'dist', 'lib_target')
 
     def test_application_dist_dir(self, tmpdir):
         directory, config, _ = self._make_config(tmpdir)
 
-        self._verify_path_attr(directory, config, '_app_dir', config.application_dist_dir, 'dist', 'app_target')
+        self._verify_path_attr(directory, config, 'application_dist', config.application_dist_dir, 'dist', 'app_target')
+
+    def test_ensure_creates_cached_dir(self, tmpdir):
+        directory, config, _ = self._make_config(tmpdir)
+        expected = directory / 'build'
+
+        assert config.build_dir() == expected
+        assert not expected.exists()
+        assert config.build_dir(ensure=True) == expected
+        assert expected.is_dir()
+
+        # noinspection PyProtectedMember
+        assert config._directories['build'] == (expected, True, True)
+
+    def test_cached_dir_flags_are_kept(self, tmpdir):
+        directory, config, _ = self._make_config(tmpdir)
+        expected = directory / 'build'
+
+        assert config.build_dir(ensure=True) == expected
+
+        expected.rmdir()
+
+        # A weaker request is answered from the cache without touching the disk.
+        assert config.build_dir(required=True) == expected
+        assert not expected.exists()
+
+        config.clear_directory_cache()
+
+        with pytest.raises(ValueError):
+            config.build_dir(required=True)
+
+    def test_configs_are_slotted(self, tmpdir):
+        _, java_config, package_config = self._make_config(tmpdir)
+
+        for config in (java_config, package_config, JavaTestingConfiguration()):
+            assert not hasattr(config, '__dict__')
+
+            with pytest.raises(AttributeError):
+                config.bogus = True
 
     def test_entry_point(self, tmpdir):
         _, _, package_config = self._make_config(tmpdir)
@@ -100,6 +147,104 @@ class TestJavaConfig(object):
 
         assert package_config.get_entry_point() == 'entry point'
 
+    def test_extra_content(self, tmpdir):
+        directory, java_config, package_config = self._make_config(tmpdir)
+
+        assert package_config.get_extra_content(java_config) == []
+
+        # The empty answer is remembered, just like any other.
+        package_config.include = [{'source': 'extra', 'under': 'docs'}]
+
+        assert package_config.get_extra_content(java_config) == []
+
+        _, java_config, package_config = self._make_config(tmpdir)
+        package_config.include = [{'source': 'extra', 'under': 'docs'}, {'source': 'more'}]
+
+        assert package_config.get_extra_content(java_config) == [
+            (directory / 'extra', Path('docs')),
+            (directory / 'more', None)
+        ]
+
+    def test_path_dispositions(self, tmpdir):
+        _, _, package_config = self._make_config(tmpdir)
+
+        package_config.exclude = ['*.txt', '~secret/', 'lib/native.so']
+        package_config.duplicates = {'*.properties': 'newest', '~com/.*': 'first'}
+
+        assert package_config.get_path_disposition(Path('META-INF/MANIFEST.MF')) == 'exclude'
+        assert package_config.get_path_disposition(Path('readme.txt')) == 'exclude'
+        assert package_config.get_path_disposition(Path('secret/key.bin')) == 'exclude'
+        assert package_config.get_path_disposition(Path('lib/native.so')) == 'exclude'
+        assert package_config.get_path_disposition(Path('lib/native.so.1')) is None
+        assert package_config.get_path_disposition(Path('META-INF/LICENSE')) == 'merge'
+        assert package_config.get_path_disposition(Path('META-INF/license.txt')) == 'exclude'
+        assert package_config.get_path_disposition(Path('META-INF/services/com.example.Service')) == 'merge'
+        assert package_config.get_path_disposition(Path('meta-inf/services/com.example.Service')) == 'merge'
+        assert package_config.get_path_disposition(Path('META-INF/SERVICES/com.example.Service')) is None
+        assert package_config.get_path_disposition(Path('app.properties')) == 'newest'
+        assert package_config.get_path_disposition(Path('com/example/App.class')) == 'first'
+        assert package_config.get_path_disposition(Path('org/example/App.class')) is None
+
+        assert package_config.get_path_disposition(ZipInfo('META-INF/LICENSE')) == 'merge'
+        assert package_config.get_path_disposition(PureWindowsPath('com\\example\\App.class')) == 'first'
+
+        assert package_config.should_include(Path('readme.txt')) is False
+        assert package_config.should_include(Path('org/example/App.class')) is True
+
+    def test_path_disposition_regexes_stand_alone(self, tmpdir):
+        _, _, package_config = self._make_config(tmpdir)
+
+        package_config.exclude = ['*.txt', '~(?i)secret/.*', '~(a)/\\1\\.bin']
+        package_config.duplicates = {
+            '*.xml': 'first', '~(?i)CONF/.*': 'newest', '~(\\w+)/\\1\\.properties': 'largest', '*.properties': 'last'
+        }
+
+        assert package_config.get_path_disposition(Path('readme.txt')) == 'exclude'
+        assert package_config.get_path_disposition(Path('SECRET/key.bin')) == 'exclude'
+        assert package_config.get_path_disposition(Path('a/a.bin')) == 'exclude'
+        assert package_config.get_path_disposition(Path('a/b.bin')) is None
+        assert package_config.get_path_disposition(Path('conf/app.xml')) == 'first'
+        assert package_config.get_path_disposition(Path('conf/app.json')) == 'newest'
+        assert package_config.get_path_disposition(Path('app/app.properties')) == 'largest'
+        assert package_config.get_path_disposition(Path('app/other.properties')) == 'last'
+
+    def test_path_disposition_patterns_are_shared(self, tmpdir):
+        _, _, first = self._make_config(tmpdir)
+        _, _, second = self._make_config(tmpdir)
+
+        for package_config in (first, second):
+            package_config.exclude = ['*.txt']
+            package_config.duplicates = {'*.properties': 'newest'}
+            package_config.get_path_disposition(Path('App.class'))
+
+        # noinspection PyProtectedMember
+        assert first._exclude_pattern is second._exclude_pattern
+        # noinspection PyProtectedMember
+        assert first._duplicate_rules is second._duplicate_rules
+
+    def test_path_dispositions_are_cached(self, tmpdir):
+        _, _, package_config = self._make_config(tmpdir)
+
+        assert package_config.get_path_disposition(Path('META-INF/MANIFEST.MF')) == 'exclude'
+        assert package_config.get_path_disposition(Path('App.class')) is None
+
+        # noinspection PyProtectedMember
+        assert package_config._disposition_cache == {'META-INF/MANIFEST.MF': 'exclude', 'App.class': None}
+
+    def test_path_dispositions_follow_settings(self, tmpdir):
+        _, _, package_config = self._make_config(tmpdir)
+
+        assert package_config.get_path_disposition(Path('readme.txt')) is None
+        assert package_config.get_path_disposition(Path('app.properties')) is None
+
+        package_config.exclude = ['*.txt']
+
+        assert package_config.get_path_disposition(Path('readme.txt')) == 'exclude'
+
+        package_config.duplicates = {'*.properties': 'newest'}
+
+        assert package_config.get_path_disposition(Path('app.properties')) == 'newest'
+
     def test_package_sources(self, tmpdir):
         _, java_config, package_config = self._make_config(tmpdir)
 
@@ -135,6 +280,44 @@ class TestJavaConfig(object):
         assert package_config.package_doc(java_config) is True
 
 
+class TestJavaClean(object):
+    @staticmethod
+    def _make_tree(directory: Path):
+        (directory / 'sub').mkdir(parents=True)
+        (directory / 'file.txt').write_text('text')
+        (directory / 'sub' / 'file.txt').write_text('text')
+
+    def test_java_clean(self, tmpdir):
+        directory = Path(str(tmpdir))
+        project = Project.from_dir(directory)
+
+        with Options(project=project):
+            config = JavaConfiguration()
+
+        self._make_tree(directory / 'build')
+        self._make_tree(directory / 'dist')
+
+        java_clean(config)
+
+        assert not (directory / 'build').exists()
+        assert not (directory / 'dist').exists()
+
+    def test_java_clean_nested(self, tmpdir):
+        directory = Path(str(tmpdir))
+        project = Project.from_dir(directory)
+
+        with Options(project=project):
+            config = JavaConfiguration()
+
+        config.dist = 'build/dist'
+
+        self._make_tree(directory / 'build' / 'dist')
+
+        java_clean(config)
+
+        assert not (directory / 'build').exists()
+
+
 class TestGetJavaCVersion(object):
     def test_working_javac_version_call(self):
         for version in ['14', '14.3', '14.2.1']:
@@ -143,6 +326,13 @@ class TestGetJavaCVersion(object):
             with FakeProcessContext(process):
                 assert get_javac_version() == (version, 14)
 
+    def test_unexpected_javac_version_output(self):
+        for output in ['', 'javac\n', 'javac unknown\n']:
+            process = FakeProcess(['javac', '-version'], stdout=output)
+
+            with FakeProcessContext(process):
+                assert get_javac_version() == (None, None)
+
     def test_javac_version_call_failure(self):
         # noinspection PyUnusedLocal
         def failing_call(args: Sequence[str], capture: bool, cwd: Path) -> CompletedProcess:
@@ -152,6 +342,41 @@ class TestGetJavaCVersion(object):
             assert get_javac_version() == (None, None)
 
 
+class TestGetReleaseVersion(object):
+    @staticmethod
+    def _make_jdk(directory: Path, release: Optional[str]) -> Path:
+        bin_dir = directory / 'jdk' / 'bin'
+        javac = bin_dir / 'javac'
+
+        bin_dir.mkdir(parents=True)
+        javac.write_text('#!/bin/sh\n')
+        javac.chmod(0o755)
+
+        if release is not None:
+            (directory / 'jdk' / 'release').write_text(release)
+
+        return bin_dir
+
+    def test_release_version(self, tmpdir, monkeypatch):
+        bin_dir = self._make_jdk(Path(str(tmpdir)), 'IMPLEMENTOR="Someone"\nJAVA_VERSION="16.0.1"\n')
+
+        monkeypatch.setenv('PATH', str(bin_dir))
+
+        assert _get_release_version() == '16.0.1'
+
+    def test_release_version_no_release_file(self, tmpdir, monkeypatch):
+        bin_dir = self._make_jdk(Path(str(tmpdir)), None)
+
+        monkeypatch.setenv('PATH', str(bin_dir))
+
+        assert _get_release_version() is None
+
+    def test_release_version_no_javac(self, tmpdir, monkeypatch):
+        monkeypatch.setenv('PATH', str(tmpdir))
+
+        assert _get_release_version() is None
+
+
 class TestVerboseOptions(object):
     def test_add_verbose_options_not_verbose_enough(self):
         options = []
@@ -216,6 +441,25 @@ class TestAddClassPath(object):
 
         assert options == ['--class-path', expected_class_path]
 
+    def test_add_class_path_with_paths(self):
+        dep = Dependency('dep', {
+            'location': 'local',
+            'version': '4.5.6',
+            'scope': 'scope'
+        })
+        expected_class_path = os.pathsep.join(['classes', 'a.jar'])
+        options = ['-d', 'out']
+
+        add_class_path(options, [DependencyPathSet(dep, Path('a.jar'))], [Path('classes')])
+
+        assert options == ['-d', 'out', '--class-path', expected_class_path]
+
+        options = []
+
+        add_class_path(options, [])
+
+        assert options == []
+
 
 class TestBuildNames(object):
     def test_build_names(self):
@@ -231,3 +475,21 @@ class TestBuildNames(object):
         assert resolver._directory_path == Path('dep')
         assert classified == 'dep-4.5.6'
         assert base_name == 'dep-4.5.6'
+
+    def test_build_names_without_version_in_url(self):
+        dependency = Dependency('dep', {
+            'location': 'remote',
+            'group': 'com.example',
+            'version': '4.5.6',
+            'classifier': 'sources',
+            'scope': 'scope'
+        })
+
+        resolver, classified, base_name = build_names(dependency, version_in_url=False)
+
+        assert resolver._directory_url == 'https://repo1.maven.org/maven2/com/example/dep'
+        assert classified == 'dep-4.5.6-sources'
+        assert base_name == 'dep-4.5.6'
+
+        # A second request for the same dependency still gets its own resolver.
+        assert build_names(dependency, version_in_url=False)[0] is not resolver
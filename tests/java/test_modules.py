@@ -8,7 +8,7 @@ from pathlib import Path
 import pytest
 
 from builder import VERSION
-from builder.java.modules import Component, VariantFile, Variant, API_ELEMENTS, ModuleData
+from builder.java.modules import Component, VariantFile, Variant, API_ELEMENTS, RUNTIME_ELEMENTS, ModuleData
 from builder.models import Dependency
 from tests.test_support import get_test_path
 
@@ -26,6 +26,17 @@ class TestComponent(object):
             }
         }
 
+    def test_default_attributes_are_shared(self):
+        first = Component('group', 'module', '1.2.3')
+        second = Component('group', 'other', '1.2.3')
+
+        # noinspection PyProtectedMember
+        assert first._attributes is second._attributes
+
+        first.to_dict()['attributes']['org.gradle.status'] = 'changed'
+
+        assert second.to_dict()['attributes'] == {'org.gradle.status': 'release'}
+
     def test_from_dict(self):
         component = Component.from_dict({
             'group': 'my_group',
@@ -99,7 +110,7 @@ class TestVariantFile(object):
         file = VariantFile('name', 'url', 12)
 
         assert file.name == 'name'
-        assert isinstance(file.signatures, OrderedDict)
+        assert isinstance(file.signatures, dict)
         assert len(file.signatures) == 0
         assert file.to_dict() == {
             'name': 'name',
@@ -112,8 +123,8 @@ class TestVariantFile(object):
         signatures = {'sha512': '<big-digital-signature', 'md5': '<small-digital-signature'}
         file.signatures = signatures
 
-        assert isinstance(file.signatures, OrderedDict)
-        assert file.signatures is not signatures
+        assert isinstance(file.signatures, dict)
+        assert file.signatures is signatures
         assert len(file.signatures) == 2
 
         assert file.to_dict() == {
@@ -130,8 +141,8 @@ class TestVariantFile(object):
         )
         file.signatures = signatures
 
-        assert isinstance(file.signatures, OrderedDict)
-        assert file.signatures is signatures
+        assert file.signatures.__class__ is dict
+        assert file.signatures == signatures
 
         assert file.to_dict() == {
             'name': 'name',
@@ -204,6 +215,9 @@ class TestVariantFile(object):
             'size': 4
         }
 
+        assert VariantFile.from_path(Path(str(tmpdir))).to_dict()['size'] == 0
+        assert VariantFile.from_path(path / 'child').to_dict()['size'] == 0
+
 
 class TestVariant(object):
     def test_construction(self):
@@ -241,6 +255,15 @@ class TestVariant(object):
             }
         }
 
+    def test_attribute_names_are_shared(self):
+        first = Variant(API_ELEMENTS).set_attr('test', 'value')
+        second = Variant.from_dict({'name': RUNTIME_ELEMENTS, 'attributes': {''.join(['org.gradle.', 'test']): 1}})
+
+        first_name, = first.to_dict()['attributes']
+        second_name, = second.to_dict()['attributes']
+
+        assert first_name is second_name
+
     def test_dependencies(self):
         dependency = Dependency('dep', {
             'location': 'local',
@@ -442,3 +465,30 @@ class TestModuleData(object):
             },
             "variants": []
         }
+
+    def test_write_without_orjson(self, tmpdir, monkeypatch):
+        orjson = pytest.importorskip('orjson')
+        md = ModuleData.for_component(Component('grüppe', 'módulo', '1.0'))
+        fast_path = Path(str(tmpdir)) / 'fast.json'
+        slow_path = Path(str(tmpdir)) / 'slow.json'
+
+        md.write(fast_path)
+
+        monkeypatch.setattr('builder.java.modules.orjson', None)
+
+        md.write(slow_path)
+
+        assert slow_path.read_bytes() == fast_path.read_bytes()
+        assert slow_path.read_bytes() == orjson.dumps(md.to_dict(), option=orjson.OPT_INDENT_2)
+        assert 'grüppe'.encode('utf-8') in slow_path.read_bytes()
+
+    def test_module_classes_are_slotted(self):
+        things = (
+            Component('group', 'module', '1.0'), VariantFile('name', 'url', 0), Variant(API_ELEMENTS), ModuleData()
+        )
+
+        for thing in things:
+            assert not hasattr(thing, '__dict__')
+
+            with pytest.raises(AttributeError):
+                thing.bogus = True
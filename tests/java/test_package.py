@@ -2,8 +2,11 @@
 This file contains all the unit tests for our packaging support.
 """
 import json
+import os
 from pathlib import Path
+from typing import Tuple, List
 from unittest.mock import patch, call
+from zipfile import ZipFile
 
 # noinspection PyPackageRequirements
 import pytest
@@ -11,45 +14,12 @@ from builder.java.modules import ModuleData, Variant, API_ELEMENTS, SOURCE_ELEME
 
 from builder.java import JavaConfiguration, PackageConfiguration
 # noinspection PyProtectedMember
-from builder.java.package import _build_jar_options, _include_directory, _get_packaging_dirs, _find_entry_point, \
-    _create_manifest, _run_packager, java_package, _create_module_data, _set_file_attributes, _add_variant
+from builder.java.package import _get_packaging_dirs, _find_entry_point, _create_manifest, _run_packager, \
+    java_package, _create_module_data, _set_file_attributes, _add_variant, _manifest_content, _wrap_manifest_line, \
+    _build_primary_jar, _manifest_header, _walk_tree
 from builder.models import Dependency, DependencyPathSet
 from builder.project import Project
-from tests.test_support import Options, FakeProcessContext, FakeProcess, get_test_path, Regex
-
-
-class TestBuildOptions(object):
-    def test_build_options_no_entry_point(self):
-        """Make sure we build options correctly with no entry point."""
-        path = Path('path/to/file.jar')
-        options = _build_jar_options(path, None)
-
-        assert options == ['--create', '--file', 'path/to/file.jar']
-
-    def test_build_options_with_verbose(self):
-        """Make sure we build options correctly with no entry point but verbosely."""
-        path = Path('path/to/file.jar')
-
-        with Options(verbose=3):
-            options = _build_jar_options(path, None)
-
-        assert options == ['-verbose', '--create', '--file', 'path/to/file.jar']
-
-    def test_build_options_with_entry_point(self):
-        """Make sure we build options correctly with an entry point."""
-        path = Path('path/to/file.jar')
-        options = _build_jar_options(path, 'com.me.Main')
-
-        assert options == ['--create', '--file', 'path/to/file.jar', '--main-class', 'com.me.Main']
-
-    def test_include_dir(self):
-        """Make sure adding a directory to the jar options works correctly."""
-        path = Path('path/to/dir')
-        options = []
-
-        _include_directory(options, path)
-
-        assert options == ['-C', 'path/to/dir', '.']
+from tests.test_support import Options, FakeProcessContext, get_test_path, Regex, make_class_file
 
 
 class TestGetPackageDirs(object):
@@ -86,80 +56,125 @@ class TestGetPackageDirs(object):
 
 
 class TestFindEntryPoint(object):
-    def test_no_entry_point_found(self):
-        path = Path('.')  # Doesn't matter what it is.
-        process = FakeProcess(None, get_test_path('java/javap/one-class-no-main.txt'), check_args=False)
+    @staticmethod
+    def _make_classes(tmpdir, **classes: bool) -> Path:
+        classes_dir = Path(str(tmpdir)) / 'classes'
+
+        for name, entry_point in classes.items():
+            path = classes_dir / f'{name.replace(".", "/")}.class'
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(make_class_file(name, entry_point))
+
+        return classes_dir
 
-        with FakeProcessContext(process):
+    @staticmethod
+    def _cache_path(tmpdir) -> Path:
+        return Path(str(tmpdir)) / 'entry_points.json'
+
+    def test_no_entry_point_found(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.ui.UIUtils': False})
+
+        with FakeProcessContext([]):
             with pytest.raises(ValueError) as info:
-                _find_entry_point(path, None)
+                _find_entry_point(path, None, self._cache_path(tmpdir))
 
         assert info.value.args[0] == 'No entry point found for the application.'
 
-    def test_too_many_entry_points_found(self):
-        path = Path('.')  # Doesn't matter what it is.
-        process = FakeProcess(None, get_test_path('java/javap/many-classes-multi-mains.txt'), check_args=False)
+    def test_too_many_entry_points_found(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.App': True, 'com.example.ui.UIUtils': True})
 
-        with FakeProcessContext(process):
+        with FakeProcessContext([]):
             with pytest.raises(ValueError) as info:
-                _find_entry_point(path, None)
+                _find_entry_point(path, None, self._cache_path(tmpdir))
 
-        assert info.value.args[0] == 'Too many entry points found: com.example.ui.UIUtils, com.example.App.  You ' \
+        assert info.value.args[0] == 'Too many entry points found: com.example.App, com.example.ui.UIUtils.  You ' \
                                      'will need to specify one.'
 
-    def test_one_entry_point_found(self):
-        path = Path('.')  # Doesn't matter what it is.
-        process = FakeProcess(None, get_test_path('java/javap/one-class-with-main.txt'), check_args=False)
+    def test_same_entry_point_counted_once(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.App': True})
 
-        with FakeProcessContext(process):
-            assert _find_entry_point(path, None) == 'com.example.ui.UIUtils'
+        (path / 'Copy.class').write_bytes(make_class_file('com.example.App'))
 
-    def test_specified_entry_point_not_found_zero_discovered(self):
-        path = Path('.')  # Doesn't matter what it is.
-        process = FakeProcess(None, get_test_path('java/javap/one-class-no-main.txt'), check_args=False)
+        assert _find_entry_point(path, None, self._cache_path(tmpdir)) == 'com.example.App'
 
-        with FakeProcessContext(process):
-            with pytest.raises(ValueError) as info:
-                _find_entry_point(path, 'com.bad.EntryPoint')
+    def test_one_entry_point_found(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.Frame': False, 'com.example.ui.UIUtils': True})
+
+        with FakeProcessContext([]):
+            assert _find_entry_point(path, None, self._cache_path(tmpdir)) == 'com.example.ui.UIUtils'
+
+    def test_specified_entry_point_not_found_zero_discovered(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.ui.UIUtils': False, 'com.bad.EntryPoint': False})
+
+        with pytest.raises(ValueError) as info:
+            _find_entry_point(path, 'com.bad.EntryPoint', self._cache_path(tmpdir))
 
         assert info.value.args[0] == 'Specified entry point com.bad.EntryPoint not found in compiled classes.'
 
-    def test_specified_entry_point_not_found_one_discovered(self):
-        path = Path('.')  # Doesn't matter what it is.
-        process = FakeProcess(None, get_test_path('java/javap/one-class-with-main.txt'), check_args=False)
+    def test_specified_entry_point_not_found_one_discovered(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.ui.UIUtils': True})
 
-        with FakeProcessContext(process):
-            with pytest.raises(ValueError) as info:
-                _find_entry_point(path, 'com.bad.EntryPoint')
+        with pytest.raises(ValueError) as info:
+            _find_entry_point(path, 'com.bad.EntryPoint', self._cache_path(tmpdir))
 
         assert info.value.args[0] == 'Specified entry point com.bad.EntryPoint not found in compiled classes.'
 
-    def test_specified_entry_point_matches_one_discovered(self):
-        path = Path('.')  # Doesn't matter what it is.
-        process = FakeProcess(None, get_test_path('java/javap/one-class-with-main.txt'), check_args=False)
+    def test_specified_entry_point_matches_one_discovered(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.ui.UIUtils': True})
+
+        assert _find_entry_point(path, 'com.example.ui.UIUtils', self._cache_path(tmpdir)) == 'com.example.ui.UIUtils'
+
+    def test_specified_entry_point_matches_many_discovered(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.App': True, 'com.example.ui.UIUtils': True})
+
+        assert _find_entry_point(path, 'com.example.App', self._cache_path(tmpdir)) == 'com.example.App'
+
+    def test_specified_entry_point_read_alone(self, tmpdir):
+        path = self._make_classes(tmpdir, **{'com.example.ui.UIUtils': True})
 
-        with FakeProcessContext(process):
-            assert _find_entry_point(path, 'com.example.ui.UIUtils') == 'com.example.ui.UIUtils'
+        (path / 'Other.class').write_bytes(b'not a class file')
 
-    def test_specified_entry_point_matches_many_discovered(self):
-        path = Path('.')  # Doesn't matter what it is.
-        process = FakeProcess(None, get_test_path('java/javap/many-classes-multi-mains.txt'), check_args=False)
+        assert _find_entry_point(path, 'com.example.ui.UIUtils', self._cache_path(tmpdir)) == 'com.example.ui.UIUtils'
 
-        with FakeProcessContext(process):
-            assert _find_entry_point(path, 'com.example.App') == 'com.example.App'
+        with pytest.raises(ValueError) as info:
+            _find_entry_point(path, None, self._cache_path(tmpdir))
+
+        assert info.value.args[0] == f'{path / "Other.class"} is not a compiled Java class file.'
+
+    def test_entry_points_are_cached(self, tmpdir, monkeypatch):
+        classes_dir = self._make_classes(tmpdir, A=True, B=False)
+        cache_path = Path(str(tmpdir)) / 'entry_points.json'
+
+        assert _find_entry_point(classes_dir, None, cache_path) == 'A'
+        assert cache_path.is_file()
+
+        monkeypatch.setattr('builder.java.package.read_entry_point', lambda path: pytest.fail(f'{path} was read.'))
+
+        assert _find_entry_point(classes_dir, None, cache_path) == 'A'
+
+        monkeypatch.undo()
+
+        (classes_dir / 'B.class').write_bytes(make_class_file('B', True) + b'\0')
+
+        with pytest.raises(ValueError) as info:
+            _find_entry_point(classes_dir, None, cache_path)
+
+        assert info.value.args[0] == 'Too many entry points found: A, B.  You will need to specify one.'
 
 
 class TestCreateManifest(object):
     def test_create_manifest(self):
-        lines = _create_manifest('1.2.3', 'my desc')
+        manifest = _create_manifest('1.2.3', 'my desc')
 
-        assert lines == [
+        assert isinstance(manifest, bytes)
+        assert manifest.decode('utf-8').split('\r\n') == [
             'Manifest-Version: 1.0',
             Regex(r'Created-By: \d+(?:\.\d+(?:\.\d+)?)? [(]Builder, v\d+\.\d+\.\d+[)]'),
             'Specification-Title: my desc',
             'Specification-Version: 1.2.3',
             'Implementation-Title: my desc',
-            'Implementation-Version: 1.2.3'
+            'Implementation-Version: 1.2.3',
+            ''
         ]
 
 
@@ -248,65 +263,163 @@ class TestModuleDataCreation(object):
         self._compare_to_file(module_data, 'variant_2')
 
 
+def _read_jar(jar_file: Path) -> Tuple[List[str], str]:
+    with ZipFile(jar_file) as jar:
+        return jar.namelist(), jar.read('META-INF/MANIFEST.MF').decode('utf-8')
+
+
+class TestManifestContent(object):
+    def test_manifest_lines(self):
+        manifest = _create_manifest('1.2.3', 'my desc')
+        expected = manifest + b'Main-Class: com.me.Main\r\n\r\n'
+
+        assert _manifest_content(manifest, 'com.me.Main') == expected
+
+    def test_default_manifest(self):
+        content = _manifest_content(None, None).decode('utf-8')
+
+        assert content.startswith('Manifest-Version: 1.0\r\nCreated-By: ')
+        assert content.endswith(')\r\n\r\n')
+
+    def test_manifest_header_is_shared(self):
+        header = _manifest_header()
+
+        assert _manifest_header() is header
+        assert _create_manifest('1.2.3', 'my desc').startswith(header)
+        assert _manifest_content(None, None) == header + b'\r\n'
+
+    def test_long_lines_wrap(self):
+        line = f'Implementation-Title: {"x" * 100}'
+        wrapped = _wrap_manifest_line(line)
+
+        assert wrapped == f'{line[:72]}\r\n {line[72:]}\r\n'.encode('utf-8')
+
+        line = f'Implementation-Title: {"x" * 49}\u00e9{"y" * 80}'
+        wrapped = _wrap_manifest_line(line)
+        physical_lines = wrapped.split(b'\r\n')
+
+        assert [len(physical_line) for physical_line in physical_lines] == [71, 72, 12, 0]
+        assert wrapped.replace(b'\r\n ', b'').decode('utf-8') == f'{line}\r\n'
+
+
 # noinspection DuplicatedCode
 class TestRunJar(object):
-    def test_jar_no_resources(self):
-        jar_file = Path('file.jar')
-        directory = Path('classes')
-        expected = [
-            'jar', '--create', '--file', str(jar_file), '--manifest', Regex('.*'), '-C', str(directory), '.'
-        ]
+    @staticmethod
+    def _make_tree(root: Path, *names: str) -> Path:
+        for name in names:
+            path = root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(name, encoding='utf-8')
+        return root
+
+    def test_jar_no_resources(self, tmpdir):
+        jar_file = Path(str(tmpdir)) / 'file.jar'
+        directory = self._make_tree(Path(str(tmpdir)) / 'classes', 'com/example/B.class', 'com/example/A.class')
         manifest = _create_manifest('1.2.3', 'my desc')
 
-        with FakeProcessContext(FakeProcess(expected)):
-            with patch('builder.java.package.sign_path') as mock_signer:
-                mock_signer.return_value = {}
+        with patch('builder.java.package.sign_path') as mock_signer:
+            mock_signer.return_value = {}
 
-                result = _run_packager(manifest, None, jar_file, directory, None)
+            result = _run_packager(manifest, None, jar_file, directory, None)
 
-            mock_signer.assert_called_once_with(jar_file)
+        mock_signer.assert_called_once_with(jar_file)
 
-            assert result == {}
+        assert result == {}
 
-    def test_jar_no_manifest(self):
-        jar_file = Path('file.jar')
-        directory = Path('classes')
-        expected = [
-            'jar', '--create', '--file', str(jar_file), '-C', str(directory), '.'
+        names, content = _read_jar(jar_file)
+
+        assert names == [
+            'META-INF/', 'META-INF/MANIFEST.MF', 'com/', 'com/example/', 'com/example/A.class', 'com/example/B.class'
         ]
+        assert content == _manifest_content(manifest, None).decode('utf-8')
 
-        with FakeProcessContext(FakeProcess(expected)):
-            with patch('builder.java.package.sign_path') as mock_signer:
-                mock_signer.return_value = {}
+    def test_jar_no_manifest(self, tmpdir):
+        jar_file = Path(str(tmpdir)) / 'file.jar'
+        directory = self._make_tree(Path(str(tmpdir)) / 'classes', 'A.class', 'META-INF/MANIFEST.MF')
 
-                result = _run_packager(None, None, jar_file, directory, None)
+        with patch('builder.java.package.sign_path') as mock_signer:
+            mock_signer.return_value = {}
 
-            mock_signer.assert_called_once_with(jar_file)
+            result = _run_packager(None, 'com.me.Main', jar_file, directory, None)
+
+        mock_signer.assert_called_once_with(jar_file)
 
-            assert result == {}
+        assert result == {}
 
-    def test_jar_with_resources(self):
-        jar_file = Path('file.jar')
-        directory = Path('classes')
-        resources = get_test_path('java/javap')
-        expected = [
-            'jar', '--create', '--file', str(jar_file), '--manifest', Regex('.*'), '-C', str(directory), '.',
-            '-C', str(resources), '.'
-        ]
+        names, content = _read_jar(jar_file)
+
+        assert names == ['META-INF/', 'META-INF/MANIFEST.MF', 'A.class']
+        assert content == _manifest_content(None, 'com.me.Main').decode('utf-8')
+
+    def test_jar_with_resources(self, tmpdir):
+        jar_file = Path(str(tmpdir)) / 'file.jar'
+        directory = self._make_tree(Path(str(tmpdir)) / 'classes', 'A.class', 'same.txt')
+        resources = self._make_tree(Path(str(tmpdir)) / 'resources', 'same.txt', 'data/other.txt')
         manifest = _create_manifest('1.2.3', 'my desc')
 
-        with FakeProcessContext(FakeProcess(expected)):
+        with patch('builder.java.package.sign_path') as mock_signer:
+            mock_signer.return_value = {}
+
+            result = _run_packager(manifest, None, jar_file, directory, resources)
+
+        mock_signer.assert_called_once_with(jar_file)
+
+        assert result == {}
+
+        names, _ = _read_jar(jar_file)
+
+        assert names == ['META-INF/', 'META-INF/MANIFEST.MF', 'A.class', 'same.txt', 'data/', 'data/other.txt']
+
+    def test_jar_compression_level(self, tmpdir):
+        directory = Path(str(tmpdir)) / 'classes'
+        sizes = []
+
+        directory.mkdir()
+        (directory / 'data.txt').write_text('0123456789abcdef' * 4096, encoding='utf-8')
+
+        for level in (0, 9):
+            jar_file = Path(str(tmpdir)) / f'file-{level}.jar'
+
             with patch('builder.java.package.sign_path') as mock_signer:
                 mock_signer.return_value = {}
 
-                result = _run_packager(manifest, None, jar_file, directory, resources)
+                _run_packager(None, None, jar_file, directory, None, level)
 
-            mock_signer.assert_called_once_with(jar_file)
+            with ZipFile(jar_file) as zip_file:
+                sizes.append(zip_file.getinfo('data.txt').compress_size)
 
-            assert result == {}
+        assert sizes[0] > sizes[1]
 
 
 # noinspection DuplicatedCode
+class TestWalkTree(object):
+    def test_walk_tree(self, tmpdir):
+        root = Path(str(tmpdir))
+
+        (root / 'b').mkdir()
+        (root / 'b/c.txt').write_text('c', encoding='utf-8')
+        (root / 'a.txt').write_text('a', encoding='utf-8')
+
+        assert [name for name, _ in _walk_tree(root)] == ['a.txt', 'b/', 'b/c.txt']
+        assert list(_walk_tree(root / 'missing')) == []
+
+    def test_walk_tree_errors(self, tmpdir, monkeypatch):
+        root = Path(str(tmpdir))
+        scandir = os.scandir
+
+        (root / 'b').mkdir()
+
+        def _scandir(path):
+            if Path(path).name == 'b':
+                raise PermissionError(13, 'Permission denied', path)
+            return scandir(path)
+
+        monkeypatch.setattr('builder.java.package.os.scandir', _scandir)
+
+        with pytest.raises(PermissionError):
+            list(_walk_tree(root))
+
+
 class TestJavaPackage(object):
     def test_no_source(self, tmpdir):
         project_dir = Path(str(tmpdir))
@@ -320,21 +433,24 @@ class TestJavaPackage(object):
         task_config.doc = False
 
         jar_file = java_config.library_dist_dir(ensure=True) / project.name / 'test-1.2.3.jar'
-        _ = java_config.classes_dir(ensure=True)
+        classes_dir = java_config.classes_dir(ensure=True)
         _ = java_config.resources_dir(ensure=True)
-        expected = [
-            'jar', '--create', '--file', str(jar_file), '--manifest', Regex('.*'), '-C', Regex('.*/jar_content'), '.'
-        ]
 
-        with FakeProcessContext(FakeProcess(expected)):
-            with Options(project=project):
-                with patch('builder.java.package.sign_path') as mock_signer:
-                    mock_signer.return_value = {}
+        (classes_dir / 'A.class').write_bytes(b'fake')
 
-                    java_package(java_config, task_config, [])
+        with Options(project=project):
+            with patch('builder.java.package.sign_path') as mock_signer:
+                mock_signer.return_value = {}
+
+                java_package(java_config, task_config, [])
 
         mock_signer.assert_called_once_with(jar_file)
 
+        names, content = _read_jar(jar_file)
+
+        assert names == ['META-INF/', 'META-INF/MANIFEST.MF', 'A.class']
+        assert 'Implementation-Version: 1.2.3\r\n' in content
+
     def test_sources_no_dir(self, tmpdir):
         project_dir = Path(str(tmpdir))
         project = Project.from_dir(project_dir, name='test', version='1.2.3')
@@ -349,17 +465,13 @@ class TestJavaPackage(object):
         _ = config.classes_dir(ensure=True)
         _ = config.resources_dir(ensure=True)
         code_dir = config.code_dir()
-        expected = [
-            'jar', '--create', '--file', str(jar_file), '--manifest', Regex('.*'), '-C', Regex('.*/jar_content'), '.'
-        ]
 
-        with FakeProcessContext(FakeProcess(expected)):
-            with pytest.raises(ValueError) as info:
-                with Options(project=project):
-                    with patch('builder.java.package.sign_path') as mock_signer:
-                        mock_signer.return_value = {}
+        with pytest.raises(ValueError) as info:
+            with Options(project=project):
+                with patch('builder.java.package.sign_path') as mock_signer:
+                    mock_signer.return_value = {}
 
-                        java_package(config, task_config, [])
+                    java_package(config, task_config, [])
 
         mock_signer.assert_called_once_with(jar_file)
 
@@ -380,21 +492,24 @@ class TestJavaPackage(object):
         _ = config.classes_dir(ensure=True)
         resources_dir = config.resources_dir(ensure=True)
         code_dir = config.code_dir(ensure=True)
-        expected_jar = [
-            'jar', '--create', '--file', str(jar_file), '--manifest', Regex('.*'), '-C', Regex('.*/jar_content'), '.'
-        ]
-        expected_sources = [
-            'jar', '--create', '--file', str(sources_jar_file), '-C', str(code_dir), '.', '-C', str(resources_dir), '.'
-        ]
 
-        with FakeProcessContext([FakeProcess(expected_jar), FakeProcess(expected_sources)]):
-            with Options(project=project):
-                with patch('builder.java.package.sign_path') as mock_signer:
-                    mock_signer.return_value = {}
+        (code_dir / 'A.java').write_text('class A {}', encoding='utf-8')
+        (resources_dir / 'data.txt').write_text('data', encoding='utf-8')
 
-                    java_package(config, task_config, [])
+        with Options(project=project):
+            with patch('builder.java.package.sign_path') as mock_signer:
+                mock_signer.return_value = {}
+
+                java_package(config, task_config, [])
 
-        assert mock_signer.mock_calls == [call(jar_file), call(sources_jar_file)]
+        # The jars are built concurrently so may be signed in any order.
+        assert mock_signer.call_count == 2
+        assert call(jar_file) in mock_signer.mock_calls
+        assert call(sources_jar_file) in mock_signer.mock_calls
+
+        names, _ = _read_jar(sources_jar_file)
+
+        assert names == ['META-INF/', 'META-INF/MANIFEST.MF', 'A.java', 'data.txt']
 
     def test_javadoc_no_dir(self, tmpdir):
         project_dir = Path(str(tmpdir))
@@ -434,16 +549,206 @@ class TestJavaPackage(object):
         _ = config.classes_dir(ensure=True)
         _ = config.resources_dir(ensure=True)
         doc_dir = config.doc_dir(ensure=True)
-        expected_jar = [
-            'jar', '--create', '--file', str(jar_file), '--manifest', Regex('.*'), '-C', Regex('.*/jar_content'), '.'
-        ]
-        expected_doc = [
-            'jar', '--create', '--file', str(doc_jar_file), '-C', str(doc_dir), '.'
-        ]
 
-        with FakeProcessContext([FakeProcess(expected_jar), FakeProcess(expected_doc)]):
-            with Options(project=project):
-                with patch('builder.java.package.sign_path') as mock_signer:
-                    mock_signer.return_value = {}
+        (doc_dir / 'index.html').write_text('<html/>', encoding='utf-8')
+
+        with Options(project=project):
+            with patch('builder.java.package.sign_path') as mock_signer:
+                mock_signer.return_value = {}
+
+                java_package(config, task_config, [])
+
+        # The jars are built concurrently so may be signed in any order.
+        assert mock_signer.call_count == 2
+        assert call(jar_file) in mock_signer.mock_calls
+        assert call(doc_jar_file) in mock_signer.mock_calls
+
+        names, _ = _read_jar(doc_jar_file)
+
+        assert names == ['META-INF/', 'META-INF/MANIFEST.MF', 'index.html']
+
+    def test_up_to_date_skips_packaging(self, tmpdir):
+        project_dir = Path(str(tmpdir))
+        project = Project.from_dir(project_dir, name='test', version='1.2.3')
+
+        with Options(project=project):
+            java_config = JavaConfiguration()
+            task_config = PackageConfiguration()
+
+        task_config.sources = False
+        task_config.doc = False
+
+        jar_file = java_config.library_dist_dir(ensure=True) / project.name / 'test-1.2.3.jar'
+        classes_dir = java_config.classes_dir(ensure=True)
+        _ = java_config.resources_dir(ensure=True)
+        class_file = classes_dir / 'A.class'
+
+        class_file.write_bytes(b'fake')
+
+        with Options(project=project):
+            java_package(java_config, task_config, [])
+
+            assert jar_file.is_file()
+            assert (java_config.build_dir() / 'package_digest.json').is_file()
+            assert not (jar_file.parent / 'test-1.2.3.digest').exists()
+
+            with patch('builder.java.package._build_primary_jar') as mock_builder:
+                java_package(java_config, task_config, [])
+
+            mock_builder.assert_not_called()
+
+            class_file.write_bytes(b'changed')
+
+            with patch('builder.java.package.sign_path') as mock_signer:
+                mock_signer.return_value = {}
+
+                java_package(java_config, task_config, [])
+
+            mock_signer.assert_called_once_with(jar_file)
+
+            jar_file.unlink()
+
+            with patch('builder.java.package.sign_path') as mock_signer:
+                mock_signer.return_value = {}
+
+                java_package(java_config, task_config, [])
+
+            mock_signer.assert_called_once_with(jar_file)
+
+            (jar_file.parent / 'test-1.2.3.module').unlink()
+
+            with patch('builder.java.package._build_primary_jar') as mock_builder:
+                mock_builder.return_value = {}
+
+                java_package(java_config, task_config, [])
+
+            mock_builder.assert_called_once()
+
+            (jar_file.parent / 'test-1.2.3.module.sha256').unlink()
+
+            with patch('builder.java.package._build_primary_jar') as mock_builder:
+                mock_builder.return_value = {}
+
+                java_package(java_config, task_config, [])
+
+            mock_builder.assert_called_once()
+
+            with patch('builder.java.package._build_primary_jar') as mock_builder:
+                java_package(java_config, task_config, [])
+
+            mock_builder.assert_not_called()
+
+        with Options(project=project, force_build=True):
+            with patch('builder.java.package._build_primary_jar') as mock_builder:
+                mock_builder.return_value = {}
+
+                java_package(java_config, task_config, [])
+
+            mock_builder.assert_called_once()
+
+
+class TestBuildPrimaryJar(object):
+    @staticmethod
+    def _setup(tmpdir) -> Tuple[Project, JavaConfiguration, PackageConfiguration, Path, Path]:
+        project_dir = Path(str(tmpdir))
+        project = Project.from_dir(project_dir, name='test', version='1.2.3')
+
+        with Options(project=project):
+            config = JavaConfiguration()
+            task_config = PackageConfiguration()
+
+        task_config.fat_jar = True
+
+        classes_dir = config.classes_dir(ensure=True)
+        (classes_dir / 'com/example').mkdir(parents=True)
+        (classes_dir / 'com/example/A.class').write_bytes(b'A')
+        (classes_dir / 'META-INF/services').mkdir(parents=True)
+        (classes_dir / 'META-INF/services/x.Service').write_bytes(b'impl.A')
+
+        dependency_jar = project_dir / 'dep.jar'
+
+        with ZipFile(dependency_jar, 'w') as jar:
+            jar.writestr('META-INF/MANIFEST.MF', 'Manifest-Version: 1.0\r\n\r\n')
+            jar.writestr('META-INF/services/x.Service', 'impl.B\n')
+            jar.writestr('com/example/A.class', b'A')
+            jar.writestr('com/dep/B.class', b'B')
+            jar.writestr('big.txt', b'1234')
+
+        return project, config, task_config, config.resources_dir(ensure=True), dependency_jar
+
+    @staticmethod
+    def _build(project, config, task_config, resources_dir, dependency_jar):
+        dependency = Dependency('dep', {
+            'location': 'remote',
+            'version': '1.2.3',
+            'scope': 'scope'
+        })
+        jar_file = dependency_jar.parent / 'test.jar'
+
+        with Options(project=project):
+            with patch('builder.java.package.sign_path') as mock_signer:
+                mock_signer.return_value = {}
+
+                # noinspection PyProtectedMember
+                _build_primary_jar(
+                    config, task_config, [DependencyPathSet(dependency, dependency_jar)],
+                    config.classes_dir(), resources_dir, jar_file
+                )
+
+        mock_signer.assert_called_once_with(jar_file)
+
+        return jar_file
+
+    def test_entries_are_merged(self, tmpdir):
+        project, config, task_config, resources_dir, dependency_jar = self._setup(tmpdir)
+        extra = Path(str(tmpdir)) / 'extra'
+
+        extra.mkdir()
+        (extra / 'notes.txt').write_text('notes', encoding='utf-8')
+        (resources_dir / 'big.txt').write_bytes(b'12')
+
+        task_config.include = [{'source': 'extra', 'under': 'docs/more'}, {'source': 'extra/notes.txt'}]
+        task_config.duplicates = {'big.txt': 'largest'}
+
+        jar_file = self._build(project, config, task_config, resources_dir, dependency_jar)
+
+        with ZipFile(jar_file) as jar:
+            assert jar.namelist() == [
+                'META-INF/', 'META-INF/MANIFEST.MF', 'META-INF/services/', 'com/', 'com/example/',
+                'com/example/A.class', 'docs/', 'docs/more/', 'docs/more/notes.txt', 'notes.txt', 'com/dep/',
+                'com/dep/B.class', 'META-INF/services/x.Service', 'big.txt'
+            ]
+            assert jar.read('META-INF/MANIFEST.MF').startswith(b'Manifest-Version: 1.0\r\nCreated-By: ')
+            assert jar.read('META-INF/services/x.Service') == b'impl.B\nimpl.A'
+            assert jar.read('big.txt') == b'1234'
+
+    def test_conflicting_duplicates(self, tmpdir):
+        project, config, task_config, resources_dir, dependency_jar = self._setup(tmpdir)
+
+        (resources_dir / 'big.txt').write_bytes(b'12')
+
+        with pytest.raises(ValueError) as info:
+            self._build(project, config, task_config, resources_dir, dependency_jar)
+
+        assert info.value.args[0] == 'Cannot package the following files.  All are duplicated but with different ' \
+                                     'content:\n    big.txt'
+        assert not (Path(str(tmpdir)) / 'test.jar').exists()
+
+    def test_conflicting_held_duplicates(self, tmpdir):
+        project, config, task_config, resources_dir, dependency_jar = self._setup(tmpdir)
+        extra = Path(str(tmpdir)) / 'extra'
+
+        extra.mkdir()
+        (extra / 'notes.txt').write_text('extra notes', encoding='utf-8')
+        (resources_dir / 'docs').mkdir()
+        (resources_dir / 'docs/notes.txt').write_text('notes', encoding='utf-8')
+
+        task_config.include = [{'source': 'extra', 'under': 'docs'}]
+        task_config.duplicates = {'docs/*': 'largest'}
+
+        with pytest.raises(ValueError) as info:
+            self._build(project, config, task_config, resources_dir, dependency_jar)
+
+        assert info.value.args[0] == 'Cannot package the following files.  All are duplicated but with different ' \
+                                     'content:\n    notes.txt'
 
-                    java_package(config, task_config, [])
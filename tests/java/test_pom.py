@@ -1,6 +1,7 @@
 """
 This file contains all the unit tests for our POM support.
 """
+from pathlib import Path
 from unittest import mock
 from unittest.mock import Mock
 
@@ -8,7 +9,7 @@ from builder.config import Configuration
 from builder.java import resolve
 from builder.models import Dependency, DependencyContext, Language, DependencyPathSet
 # noinspection PyProtectedMember
-from builder.java.pom import _get_pom_properties, read_pom_for_dependencies
+from builder.java.pom import _get_pom_properties, read_pom_for_dependencies, _load_pom, clear_pom_cache, POMFile
 from builder.java.xml_support import parse_xml_file, parse_xml_string
 from tests.test_support import get_test_path
 
@@ -77,3 +78,36 @@ class TestPOMToDependencies(object):
         read_pom_for_dependencies(pom_path, context, self._parent_dependency())
 
         assert context.is_empty()
+
+
+class TestLoadPOM(object):
+    def test_loaded_poms_are_cached(self, tmpdir):
+        """Make sure the same POM file is only parsed once."""
+        pom_path = Path(str(tmpdir)) / 'test.pom'
+        context = DependencyContext([], Language({}, 'lang'), Configuration({}, [], None))
+
+        pom_path.write_bytes(get_test_path('java/junit.pom.xml').read_bytes())
+        clear_pom_cache()
+
+        pom_file = _load_pom(pom_path, context)
+
+        assert _load_pom(pom_path, context) is pom_file
+        assert len(pom_file.dependencies()) == 1
+        assert pom_file.dependencies() is pom_file.dependencies()
+        assert pom_file.dependency_versions() == {('org.hamcrest', 'hamcrest-core'): '1.3'}
+
+        clear_pom_cache()
+
+        assert _load_pom(pom_path, context) is not pom_file
+
+    # noinspection PyProtectedMember
+    def test_property_references(self):
+        """Make sure property references in element text are resolved."""
+        pom_file = POMFile(get_test_path('java/junit-2.pom.xml'), None)
+        root = parse_xml_string(_substitute_test_doc)
+
+        pom_file._properties.update({'var1': 'value', 'v': 'x'})
+
+        assert [pom_file._resolve_property(child) for child in root.findall('child')] == [
+            None, 'testing', '{field}', 'value', '', 'x on x'
+        ]
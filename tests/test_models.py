@@ -157,6 +157,8 @@ class TestDependencyPathSet(object):
 
         assert file_set.dependency == dep
         assert file_set.primary_path is path
+        assert file_set.primary_path_str == str(path)
+        assert file_set.primary_path_str is file_set.primary_path_str
 
     def test_secondary_files(self):
         dep = _make_dep()
@@ -2,6 +2,7 @@
 This file provides some common helper functions to support our unit testing.
 """
 import re
+import struct
 from subprocess import CompletedProcess
 from pathlib import Path
 from typing import Sequence, Union, Optional, Callable, List, Dict, Any
@@ -29,7 +30,7 @@ class Regex(object):
 class Options(object):
     def __init__(self, project: Optional[Project] = None, quiet: Optional[bool] = None, verbose: Optional[int] = None,
                  languages: Optional[Sequence[str]] = None, variables: Optional[Dict[str, str]] = None,
-                 reset: bool = False):
+                 force_build: Optional[bool] = None, reset: bool = False):
         self._options = {}
         self._save = {}
         self._reset = reset
@@ -45,6 +46,8 @@ class Options(object):
                 self._options['_languages'] = languages
             if variables is not None:
                 self._options['_vars'] = variables
+            if force_build is not None:
+                self._options['_force_build'] = force_build
 
     def __enter__(self):
         if self._reset:
@@ -100,12 +103,20 @@ class FakeProcessContext(object):
         self._check_all_consumed = check_all_consumed
         self._cp = 0
 
-    def _context_runner(self, args: Sequence[str], capture_output: bool, cwd: Path) -> CompletedProcess:
+    def _context_runner(self, args: Sequence[str], capture_output: bool, cwd: Path,
+                        text: bool = False) -> CompletedProcess:
         process = self._processes[self._cp]
         self._cp = self._cp + 1
         function = process.runner if isinstance(process, FakeProcess) else process
+        result = function(args, capture_output, cwd)
 
-        return function(args, capture_output, cwd)
+        if text:
+            if isinstance(result.stdout, bytes):
+                result.stdout = result.stdout.decode('UTF-8')
+            if isinstance(result.stderr, bytes):
+                result.stderr = result.stderr.decode('UTF-8')
+
+        return result
 
     def __enter__(self):
         self._cp = 0
@@ -183,6 +194,36 @@ class FakeSchemaReader(object):
         return self._call_count
 
 
+def make_class_file(name: str, entry_point: bool = True, public: bool = True, interface: bool = False) -> bytes:
+    """
+    Build the content of a minimal compiled Java class file.  It has a long constant,
+    a field and a constructor ahead of any ``main`` method, so a reader has to step
+    over each kind of thing a real class file holds.
+    """
+    def utf8(text: str) -> bytes:
+        data = text.encode('utf-8')
+        return struct.pack('>BH', 1, len(data)) + data
+
+    # 1: this name, 2: this class, 3: super name, 4: super class, 5-6: long, 7: main,
+    # 8: main descriptor, 9: Code, 10: field name, 11: field type, 12: <init>, 13: ()V
+    pool = [
+        utf8(name.replace('.', '/')), struct.pack('>BH', 7, 1), utf8('java/lang/Object'), struct.pack('>BH', 7, 3),
+        struct.pack('>BQ', 5, 42), utf8('main'), utf8('([Ljava/lang/String;)V'), utf8('Code'), utf8('count'),
+        utf8('I'), utf8('<init>'), utf8('()V')
+    ]
+    code = struct.pack('>HIB', 9, 1, 0xB1)
+    flags = (0x0001 if public else 0) | (0x0200 | 0x0400 if interface else 0x0020)
+    methods = [struct.pack('>HHHH', 0x0001, 12, 13, 1) + code]
+
+    if entry_point:
+        methods.append(struct.pack('>HHHH', 0x0009, 7, 8, 1) + code)
+
+    return struct.pack('>IHHH', 0xCAFEBABE, 0, 52, 14) + b''.join(pool) + \
+        struct.pack('>HHHH', flags, 2, 4, 0) + \
+        struct.pack('>HHHHH', 1, 0x0002, 10, 11, 1) + struct.pack('>HIH', 9, 2, 0) + \
+        struct.pack('>H', len(methods)) + b''.join(methods) + struct.pack('>H', 0)
+
+
 def validate_attributes(thing: Any, reference: Dict[str, Any]):
     assert thing.__dict__ == reference
 
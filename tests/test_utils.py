@@ -58,6 +58,15 @@ class TestGlobalOptions(object):
 
         assert options.force_remote_fetch() is True
 
+    def test_force_build(self):
+        options = GlobalOptions()
+
+        assert options.force_build() is False
+
+        options.set_force_build(True)
+
+        assert options.force_build() is True
+
     def test_languages(self):
         options = GlobalOptions()
         languages = ('java', 'idea')
@@ -238,6 +247,25 @@ class TestRemoveDirectory(object):
         assert not sub_dir.exists()
         assert not root.exists()
 
+    def test_remove_directory_leaves_link_targets(self, tmpdir):
+        temp_dir = Path(tmpdir)
+        root = temp_dir / 'test'
+        target = temp_dir / 'target'
+        target_file = target / 'file.txt'
+
+        root.mkdir()
+        target.mkdir()
+        target_file.touch()
+
+        (root / 'dir_link').symlink_to(target, target_is_directory=True)
+        (root / 'file_link').symlink_to(target_file)
+        (root / 'broken_link').symlink_to(temp_dir / 'missing')
+
+        remove_directory(root)
+
+        assert not root.exists()
+        assert target_file.exists()
+
 
 class TestOut(object):
     def test_simple_out(self):
@@ -336,6 +364,14 @@ class TestCheckedRun(object):
                     checked_run(cmd_line, 'Testing')
         assert fe.was_called()
 
+    def test_text_output(self):
+        cmd_line = ['ls', '-l']
+
+        with FakeProcessContext(FakeProcess(cmd_line, stdout='line 1\nline 2\n')):
+            process = checked_run(cmd_line, 'Testing', capture=True, text=True)
+
+        assert process.stdout == 'line 1\nline 2\n'
+
     def test_allowed_rc(self):
         cmd_line = ['ls', '-l']
 